@@ -4,6 +4,7 @@ Performance Utilities - Connection Pooling & Caching
 Works for both CLI and MCP modes
 """
 import duckdb
+import queue
 import threading
 from functools import wraps, lru_cache
 from typing import Dict, Optional, Callable, Any
@@ -15,17 +16,64 @@ import logging
 _connection_pool: Dict[str, duckdb.DuckDBPyConnection] = {}
 _pool_lock = threading.Lock()
 
+# Per-database LIFO stacks of idle cursors. DuckDB connections are not safe to
+# share across threads, but cursors on one connection are cheap, independent
+# handles onto the same database - so each 'with' block checks one out.
+CURSOR_POOL_SIZE = 8
+_cursor_pools: Dict[str, "queue.LifoQueue"] = {}
+_checkout_local = threading.local()
+
 class PooledConnectionWrapper:
     """Wrapper that prevents pooled connections from being closed in 'with' statements"""
-    def __init__(self, conn):
+    def __init__(self, conn, db_path: Optional[str] = None):
         self._conn = conn
+        self._db_path = db_path
 
     def __enter__(self):
-        return self._conn
+        if self._db_path is None:
+            return self._conn
+
+        # Nested 'with' blocks on the same thread share one cursor, so inner
+        # helpers still see the outer block's open transaction
+        held = getattr(_checkout_local, 'held', None)
+        if held is None:
+            held = _checkout_local.held = {}
+        entry = held.get(self._db_path)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+
+        try:
+            cursor = _cursor_pools[self._db_path].get_nowait()
+        except queue.Empty:
+            cursor = self._conn.cursor()
+        held[self._db_path] = [cursor, 1]
+        return cursor
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         # Don't close the connection - it's pooled!
-        pass
+        if self._db_path is None:
+            return
+
+        held = _checkout_local.held
+        entry = held[self._db_path]
+        entry[1] -= 1
+        if entry[1]:
+            return
+        del held[self._db_path]
+
+        cursor = entry[0]
+        if exc_type is not None:
+            # State after a failure is unknown - drop it, a fresh cursor is cheap
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            return
+        try:
+            _cursor_pools[self._db_path].put_nowait(cursor)
+        except (KeyError, queue.Full):
+            cursor.close()
 
     def __getattr__(self, name):
         # Delegate all other attributes to the real connection
@@ -39,7 +87,8 @@ def get_pooled_connection(db_path: str):
     Reduces connection overhead from 10-50ms to near-zero.
 
     Returns a wrapper that prevents the connection from being closed when used
-    with 'with' statement.
+    with 'with' statement. Inside 'with' the caller gets a cursor checked out
+    from a small per-database pool, so concurrent threads don't share one handle.
 
     Args:
         db_path: Path to DuckDB database file
@@ -49,18 +98,30 @@ def get_pooled_connection(db_path: str):
     """
     db_path = str(Path(db_path).resolve())
 
-    with _pool_lock:
-        if db_path not in _connection_pool:
-            logging.debug(f"[POOL] Creating new connection: {db_path}")
-            _connection_pool[db_path] = duckdb.connect(db_path)
-        else:
-            logging.debug(f"[POOL] Reusing connection: {db_path}")
+    conn = _connection_pool.get(db_path)
+    if conn is None:
+        with _pool_lock:
+            if db_path not in _connection_pool:
+                logging.debug(f"[POOL] Creating new connection: {db_path}")
+                _connection_pool[db_path] = duckdb.connect(db_path)
+                _cursor_pools[db_path] = queue.LifoQueue(maxsize=CURSOR_POOL_SIZE)
+            conn = _connection_pool[db_path]
 
-        return PooledConnectionWrapper(_connection_pool[db_path])
+    return PooledConnectionWrapper(conn, db_path)
 
 def close_all_connections():
     """Close all pooled connections (cleanup on exit)"""
     with _pool_lock:
+        for cursors in _cursor_pools.values():
+            while True:
+                try:
+                    cursors.get_nowait().close()
+                except queue.Empty:
+                    break
+                except Exception:
+                    pass
+        _cursor_pools.clear()
+
         for db_path, conn in _connection_pool.items():
             try:
                 conn.close()
@@ -185,10 +246,11 @@ def batch_execute(conn: duckdb.DuckDBPyConnection, query: str, params_list: list
 
 # Result caching decorator with TTL
 class CachedResult:
-    """Thread-safe result cache with time-to-live"""
+    """Thread-safe result cache with time-to-live (optionally size-bounded)"""
 
-    def __init__(self, ttl_seconds: int = 300):
+    def __init__(self, ttl_seconds: int = 300, max_entries: Optional[int] = None):
         self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
         self.cache = {}
         self.timestamps = {}
         self.lock = threading.Lock()
@@ -210,8 +272,17 @@ class CachedResult:
     def set(self, key: str, value: Any):
         """Store result in cache"""
         with self.lock:
+            self.cache.pop(key, None)
             self.cache[key] = value
             self.timestamps[key] = time.time()
+
+            # Evict oldest insertions once over the cap (dicts keep insert order)
+            if self.max_entries is not None:
+                while len(self.cache) > self.max_entries:
+                    oldest = next(iter(self.cache))
+                    del self.cache[oldest]
+                    del self.timestamps[oldest]
+
             logging.debug(f"[CACHE] Set: {key}")
 
     def clear(self):
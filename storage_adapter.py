@@ -9,7 +9,7 @@ Priority order:
 This provides a consistent API regardless of which backend is configured.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import logging
 
 # Dual import pattern (package vs direct execution)
@@ -102,10 +102,54 @@ class TeambookStorageAdapter:
         """Update note fields."""
         return self._backend.update_note(note_id, **updates)
 
+    def update_note_returning(self, note_id: int, **updates) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Update note fields and return the note as it was read.
+
+        Returns (outcome, note) where outcome is 'updated', 'not_found'
+        or 'update_failed'.
+        """
+        # Backends with UPDATE ... RETURNING do it in one round-trip
+        if hasattr(self._backend, 'update_note_returning'):
+            return self._backend.update_note_returning(note_id, **updates)
+
+        note = self._backend.get_note(note_id)
+        if not note:
+            return 'not_found', None
+
+        if not self._backend.update_note(note_id, **updates):
+            return 'update_failed', note
+
+        return 'updated', note
+
     def delete_note(self, note_id: int) -> bool:
         """Delete a note."""
         return self._backend.delete_note(note_id)
 
+    def try_claim(self, note_id: int, ai_id: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim a note for ai_id if it is unowned or already theirs.
+
+        Returns (outcome, note) where outcome is 'claimed', 'not_found',
+        'owned_by' or 'update_failed'.
+        """
+        # Backends with a native conditional update do it in one round-trip
+        if hasattr(self._backend, 'try_claim'):
+            return self._backend.try_claim(note_id, ai_id)
+
+        note = self._backend.get_note(note_id)
+        if not note:
+            return 'not_found', None
+
+        owner = note.get('owner')
+        if owner and owner != ai_id:
+            return 'owned_by', note
+
+        if not self._backend.update_note(note_id, owner=ai_id):
+            return 'update_failed', note
+
+        return 'claimed', note
+
     # ==================== EDGES ====================
 
     def add_edge(self, from_id: int, to_id: int, edge_type: str, weight: float = 1.0) -> None:
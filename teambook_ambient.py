@@ -9,16 +9,30 @@ Provides peripheral awareness of team activity without breaking focus.
 
 import sys
 import json
+import time
+import threading
+import weakref
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Optional
 from functools import wraps
+from collections import namedtuple, OrderedDict
 
 # Fix import path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from teambook_shared import CURRENT_AI_ID, CURRENT_TEAMBOOK, logging
 
+# Events are PostgreSQL-only; bind the JSONB adapter once
+try:
+    from psycopg2.extras import Json as _Json
+except ImportError:
+    def _Json(value):
+        return value
+
+# Shared default for events logged without metadata (never mutated)
+_EMPTY_METADATA = {}
+
 # ====================  HELPER ====================
 
 def get_storage_adapter(teambook_name):
@@ -33,27 +47,136 @@ def get_storage_adapter(teambook_name):
 # Storage available by default (actual check happens in get_postgres_pool)
 STORAGE_AVAILABLE = True
 
+def _pool_from_adapter(adapter):
+    """Get PostgreSQL pool from an already-resolved storage adapter"""
+    if not adapter:
+        return None
+
+    # Check if using PostgreSQL backend
+    if adapter.get_backend_type() != 'postgresql':
+        return None
+
+    # Access the internal pool (adapter._backend._pool if postgres)
+    if hasattr(adapter, '_backend') and hasattr(adapter._backend, '_pool'):
+        return adapter._backend._pool
+
+    return None
+
+
 def get_postgres_pool():
     """Get PostgreSQL connection pool from storage adapter"""
     try:
-        adapter = get_storage_adapter(CURRENT_TEAMBOOK)
-        if not adapter:
-            return None
+        return _pool_from_adapter(get_storage_adapter(CURRENT_TEAMBOOK))
+    except Exception as e:
+        logging.debug(f"Could not get postgres pool: {e}")
+        return None
 
-        # Check if using PostgreSQL backend
-        if adapter.get_backend_type() != 'postgresql':
-            return None
 
-        # Access the internal pool (adapter._backend._pool if postgres)
-        if hasattr(adapter, '_backend') and hasattr(adapter._backend, '_pool'):
-            return adapter._backend._pool
+# ==================== PREPARED STATEMENTS ====================
+
+# Hot ambient statements, PREPAREd once per PostgreSQL session so repeat
+# calls skip parse/plan
+_PREPARED_SQL = {
+    'ambient_event_insert': '''
+        INSERT INTO coordination_events
+        (timestamp, event_type, ai_id, task_id, project_id, summary, metadata)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ''',
+    # last_full_sync is only seeded on first insert
+    'ambient_last_seen_upsert': '''
+        INSERT INTO ai_last_seen (ai_id, last_ambient_check, last_full_sync)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (ai_id) DO UPDATE
+        SET last_ambient_check = EXCLUDED.last_ambient_check
+    ''',
+    'ambient_last_seen_get': '''
+        SELECT last_ambient_check FROM ai_last_seen WHERE ai_id = $1
+    ''',
+    # MAX over the serial id: an index probe, cheap enough to run on every check
+    'ambient_latest_event_id': '''
+        SELECT COALESCE(MAX(id), 0) FROM coordination_events
+    ''',
+    'ambient_events_since': '''
+        SELECT id, timestamp, event_type, ai_id, task_id, project_id, summary, metadata
+        FROM coordination_events
+        WHERE timestamp > $1
+        ORDER BY timestamp DESC
+        LIMIT 50
+    ''',
+}
+
+# Statement names already prepared, per pooled connection object
+_prepared_statements = weakref.WeakKeyDictionary()
+
+def _prepare_statement(conn, cur, name: str):
+    """PREPARE one statement from _PREPARED_SQL on this connection's session"""
+    try:
+        cur.execute(f"PREPARE {name} AS {_PREPARED_SQL[name]}")
+    except Exception as e:
+        # A failed statement aborts the transaction; callers only read before this point
+        conn.rollback()
+        # duplicate_prepared_statement: the session already has it
+        if getattr(e, 'pgcode', None) != '42P05':
+            raise
+
+def _execute_prepared(conn, cur, name: str, params: tuple):
+    """EXECUTE a statement from _PREPARED_SQL, preparing it on first use per connection"""
+    prepared = _prepared_statements.get(conn)
+    if prepared is None:
+        prepared = _prepared_statements[conn] = set()
+
+    if name not in prepared:
+        _prepare_statement(conn, cur, name)
+        prepared.add(name)
 
+    try:
+        if params:
+            cur.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+    except Exception as e:
+        # invalid_sql_statement_name: the session was reset under this connection
+        if getattr(e, 'pgcode', None) == '26000':
+            prepared.discard(name)
+        raise
+
+
+# ==================== NEW-EVENT PROBE ====================
+
+# Per-AI highest coordination_events id seen at the last probe. Lets the
+# injection path skip the last-seen/event/work-context queries when no AI,
+# in any process, has logged an event since.
+_LAST_EVENT_ID_SEEN = {}
+
+def _latest_event_id() -> Optional[int]:
+    """Highest coordination_events id (0 when empty), or None if the probe failed"""
+    pool = get_postgres_pool()
+    if not pool:
         return None
+
+    try:
+        with pool.get_connection() as conn:
+            with conn.cursor() as cur:
+                _execute_prepared(conn, cur, 'ambient_latest_event_id', ())
+                return cur.fetchone()[0]
     except Exception as e:
-        logging.debug(f"Could not get postgres pool: {e}")
+        logging.debug(f"Event probe failed: {e}")
         return None
 
 
+def _has_new_events(ai_id: str) -> bool:
+    """Cheap pre-check: any event logged since this AI's last probe?"""
+    latest = _latest_event_id()
+    if latest is None:
+        return True  # Can't tell; let the full check decide
+
+    if _LAST_EVENT_ID_SEEN.get(ai_id) == latest:
+        return False
+
+    _LAST_EVENT_ID_SEEN[ai_id] = latest
+    return True
+
+
 # ==================== EVENT LOGGING ====================
 
 def _log_coordination_event(
@@ -88,36 +211,58 @@ def _log_coordination_event(
             logging.debug(f"PostgreSQL pool not available, cannot log event {event_type}")
             return  # Events only supported on PostgreSQL
 
-        import psycopg2.extras
-
         with pool.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute('''
-                    INSERT INTO coordination_events
-                    (timestamp, event_type, ai_id, task_id, project_id, summary, metadata)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                ''', (
+                _execute_prepared(conn, cur, 'ambient_event_insert', (
                     datetime.now(timezone.utc),
                     event_type,
                     ai_id,
                     task_id,
                     project_id,
                     summary,
-                    psycopg2.extras.Json(metadata or {})
+                    _Json(metadata or _EMPTY_METADATA)
                 ))
 
+        if event_type in _WORK_CONTEXT_EVENTS:
+            invalidate_work_context(ai_id)
+
     except Exception as e:
         logging.debug(f"Event logging failed (non-critical): {e}")
 
 
 # ==================== LAST-SEEN TRACKING ====================
 
+# Last successful ai_last_seen write per AI (monotonic) - lets back-to-back ambient
+# checks skip the UPSERT round-trip (checks are already throttled above)
+_LAST_SEEN_WRITTEN = {}
+LAST_SEEN_WRITE_INTERVAL_SECONDS = 25
+
+def _default_last_seen() -> datetime:
+    """First-time / fallback last-seen: 30min ago"""
+    return datetime.now(timezone.utc) - timedelta(minutes=30)
+
+
+def _last_seen_write_due(ai_id: str, now: float) -> bool:
+    last_written = _LAST_SEEN_WRITTEN.get(ai_id)
+    return last_written is None or now - last_written >= LAST_SEEN_WRITE_INTERVAL_SECONDS
+
+
+def _read_last_seen(conn, cur, ai_id: str) -> datetime:
+    _execute_prepared(conn, cur, 'ambient_last_seen_get', (ai_id,))
+    row = cur.fetchone()
+    return row[0] if row else _default_last_seen()
+
+
 def update_last_seen(ai_id: str = None):
     """Update last ambient check timestamp for AI"""
     if not STORAGE_AVAILABLE:
         return
 
     ai_id = ai_id or CURRENT_AI_ID
+    checked_at = time.monotonic()
+
+    if not _last_seen_write_due(ai_id, checked_at):
+        return
 
     try:
         pool = get_postgres_pool()
@@ -126,12 +271,10 @@ def update_last_seen(ai_id: str = None):
 
         with pool.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute('''
-                    INSERT INTO ai_last_seen (ai_id, last_ambient_check, last_full_sync)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (ai_id) DO UPDATE
-                    SET last_ambient_check = EXCLUDED.last_ambient_check
-                ''', (ai_id, datetime.now(timezone.utc), datetime.now(timezone.utc)))
+                now = datetime.now(timezone.utc)
+                _execute_prepared(conn, cur, 'ambient_last_seen_upsert', (ai_id, now, now))
+
+        _LAST_SEEN_WRITTEN[ai_id] = checked_at
 
     except Exception as e:
         logging.debug(f"Last-seen update failed (non-critical): {e}")
@@ -140,35 +283,116 @@ def update_last_seen(ai_id: str = None):
 def get_last_seen(ai_id: str = None) -> datetime:
     """Get when AI last checked for ambient updates"""
     if not STORAGE_AVAILABLE:
-        return datetime.now(timezone.utc) - timedelta(minutes=30)  # Default: 30min ago
+        return _default_last_seen()
 
     ai_id = ai_id or CURRENT_AI_ID
 
     try:
         pool = get_postgres_pool()
         if not pool:
-            return datetime.now(timezone.utc) - timedelta(minutes=30)
+            return _default_last_seen()
 
         with pool.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute('''
-                    SELECT last_ambient_check FROM ai_last_seen WHERE ai_id = %s
-                ''', (ai_id,))
-                row = cur.fetchone()
-                if row:
-                    return row[0]
-                else:
-                    # First time - return 30min ago
-                    return datetime.now(timezone.utc) - timedelta(minutes=30)
+                return _read_last_seen(conn, cur, ai_id)
 
     except Exception as e:
         logging.debug(f"Get last-seen failed: {e}")
-        return datetime.now(timezone.utc) - timedelta(minutes=30)
+        return _default_last_seen()
+
+
+# ==================== WORK CONTEXT CACHE ====================
+
+# Per-AI (timestamp, task_ids, project_ids) - saves re-reading recent tasks
+# on every ambient check
+_CTX_CACHE = {}
+WORK_CONTEXT_TTL_SECONDS = 20
+
+# Events that change which tasks/projects an AI is working on
+_WORK_CONTEXT_EVENTS = frozenset(('task_claimed', 'task_completed', 'task_unclaimed'))
+
+def invalidate_work_context(ai_id: str = None):
+    """Drop cached work context so the next ambient check re-reads tasks"""
+    _CTX_CACHE.pop(ai_id or CURRENT_AI_ID, None)
+
+
+def _get_work_context(adapter, ai_id: str):
+    """Get (task_ids, project_ids) frozensets for AI, cached briefly"""
+    now = time.monotonic()
+    cached = _CTX_CACHE.get(ai_id)
+    if cached and now - cached[0] < WORK_CONTEXT_TTL_SECONDS:
+        return cached[1], cached[2]
+
+    my_tasks = adapter.read_notes(note_type='task', limit=100, mode='recent')
+    my_task_ids = frozenset(t['id'] for t in my_tasks if (t.get('claimed_by') == ai_id or t.get('owner') == ai_id))
+    my_project_ids = frozenset(t.get('parent_id') for t in my_tasks if t.get('parent_id'))
+
+    _CTX_CACHE[ai_id] = (now, my_task_ids, my_project_ids)
+    return my_task_ids, my_project_ids
 
 
 # ==================== EVENT RETRIEVAL & FILTERING ====================
 
-def get_relevant_events(ai_id: str = None, since: datetime = None, limit: int = 3) -> List[Dict]:
+# Lightweight row type for coordination events (tuple storage, no per-row dict)
+_Event = namedtuple('Event', 'id timestamp event_type ai_id task_id project_id summary metadata')
+
+
+def _in_my_projects(event, my_project_ids) -> bool:
+    return event.project_id in my_project_ids
+
+
+def _is_urgent(event, my_project_ids) -> bool:
+    return event.metadata.get('priority', 0) >= 9
+
+
+def _always(event, my_project_ids) -> bool:
+    return True
+
+
+# event_type -> relevance predicate; unlisted types are never shown
+_RELEVANCE_RULES = {
+    'task_completed': _in_my_projects,   # Completions in my projects
+    'task_created': _is_urgent,          # Urgent tasks (p:9) created
+    'help_requested': _in_my_projects,   # Help requests in my projects
+    'task_claimed': _in_my_projects,     # Task claims in my projects
+    'project_created': _always,          # New projects created
+}
+
+
+def _filter_relevant_events(events: List[_Event], ai_id: str, my_project_ids, limit: int) -> List[_Event]:
+    """Apply relevance rules, stopping once 'limit' events are collected"""
+    relevant = []
+
+    # Dict dispatch on event_type (one hash lookup per event)
+    get_rule = _RELEVANCE_RULES.get
+    for event in events:
+        # Skip own actions
+        if event.ai_id == ai_id:
+            continue
+
+        rule = get_rule(event.event_type)
+        if rule is not None and rule(event, my_project_ids):
+            relevant.append(event)
+            if len(relevant) >= limit:
+                break
+
+    return relevant
+
+
+# (ai_id, limit, time bucket) -> (monotonic time, events)
+_REL_CACHE = {}
+RELEVANT_CACHE_BUCKET_SECONDS = 5
+RELEVANT_CACHE_MAX_AGE_SECONDS = 60
+
+def _cache_relevant(key, events: List[_Event]):
+    now = time.monotonic()
+    # Opportunistic eviction of stale buckets
+    for stale in [k for k, (ts, _) in _REL_CACHE.items() if now - ts > RELEVANT_CACHE_MAX_AGE_SECONDS]:
+        _REL_CACHE.pop(stale, None)
+    _REL_CACHE[key] = (now, tuple(events))
+
+
+def get_relevant_events(ai_id: str = None, since: datetime = None, limit: int = 3) -> List[_Event]:
     """
     Get events relevant to this AI since last check.
 
@@ -184,94 +408,55 @@ def get_relevant_events(ai_id: str = None, since: datetime = None, limit: int =
 
     ai_id = ai_id or CURRENT_AI_ID
 
+    # Checks landing in the same short window share one query
+    cache_key = None
     if since is None:
-        since = get_last_seen(ai_id)
+        now = time.monotonic()
+        cache_key = (ai_id, limit, int(now // RELEVANT_CACHE_BUCKET_SECONDS))
+        cached = _REL_CACHE.get(cache_key)
+        if cached is not None and now - cached[0] < RELEVANT_CACHE_BUCKET_SECONDS:
+            return list(cached[1])
 
     try:
         adapter = get_storage_adapter(CURRENT_TEAMBOOK)
-        if not adapter or adapter.get_backend_type() != 'postgresql':
+        pool = _pool_from_adapter(adapter)
+        if not pool:
             return []
 
         # Get AI's current work context
-        my_tasks = adapter.read_notes(note_type='task', limit=100, mode='recent')
-        my_task_ids = [t['id'] for t in my_tasks if (t.get('claimed_by') == ai_id or t.get('owner') == ai_id)]
-        my_project_ids = list(set([t.get('parent_id') for t in my_tasks if t.get('parent_id')]))
+        my_task_ids, my_project_ids = _get_work_context(adapter, ai_id)
 
-        # Fetch recent events
-        pool = get_postgres_pool()
-        if not pool:
-            return []
+        checked_at = time.monotonic()
+        write_last_seen = _last_seen_write_due(ai_id, checked_at)
 
+        # Last-seen read, event fetch and last-seen write share one connection
         with pool.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute('''
-                    SELECT id, timestamp, event_type, ai_id, task_id, project_id, summary, metadata
-                    FROM coordination_events
-                    WHERE timestamp > %s
-                    ORDER BY timestamp DESC
-                    LIMIT 50
-                ''', (since,))
-
-                events = []
-                for row in cur.fetchall():
-                    event_id, timestamp, event_type, event_ai, task_id, project_id, summary, metadata_dict = row
-                    events.append({
-                        'id': event_id,
-                        'timestamp': timestamp,
-                        'event_type': event_type,
-                        'ai_id': event_ai,
-                        'task_id': task_id,
-                        'project_id': project_id,
-                        'summary': summary,
-                        'metadata': metadata_dict if metadata_dict else {}
-                    })
-
-        # Filter for relevance
-        relevant = []
-
-        logging.debug(f"Filtering {len(events)} events for AI {ai_id}. My projects: {my_project_ids}")
-
-        for event in events:
-            # Skip own actions
-            if event['ai_id'] == ai_id:
-                logging.debug(f"  Skip (own action): {event['event_type']} by {event['ai_id']}")
-                continue
-
-            # Always show: Completions in my projects
-            if event['event_type'] == 'task_completed' and event['project_id'] in my_project_ids:
-                logging.debug(f"  Include (completion in my project): {event['event_type']}")
-                relevant.append(event)
-                continue
-
-            # Always show: Urgent tasks created
-            if event['event_type'] == 'task_created':
-                priority = event['metadata'].get('priority', 0)
-                if priority >= 9:
-                    logging.debug(f"  Include (urgent task p:{priority}): {event['event_type']}")
-                    relevant.append(event)
-                    continue
-
-            # Always show: Help requests in my projects
-            if event['event_type'] == 'help_requested' and event['project_id'] in my_project_ids:
-                logging.debug(f"  Include (help in my project): {event['event_type']}")
-                relevant.append(event)
-                continue
-
-            # Always show: Task claims in my projects
-            if event['event_type'] == 'task_claimed' and event['project_id'] in my_project_ids:
-                logging.debug(f"  Include (claim in my project): {event['event_type']}")
-                relevant.append(event)
-                continue
-
-            # Always show: New projects created
-            if event['event_type'] == 'project_created':
-                logging.debug(f"  Include (project created): {event['event_type']} by {event['ai_id']}")
-                relevant.append(event)
-
-        # Update last-seen timestamp
-        update_last_seen(ai_id)
-
-        return relevant[:limit]
+                if since is None:
+                    since = _read_last_seen(conn, cur, ai_id)
+
+                _execute_prepared(conn, cur, 'ambient_events_since', (since,))
+
+                events = [
+                    _Event(r[0], r[1], r[2], r[3], r[4], r[5], r[6], r[7] or {})
+                    for r in cur.fetchmany(50)
+                ]
+
+                if write_last_seen:
+                    now = datetime.now(timezone.utc)
+                    _execute_prepared(conn, cur, 'ambient_last_seen_upsert', (ai_id, now, now))
+
+        if write_last_seen:
+            _LAST_SEEN_WRITTEN[ai_id] = checked_at
+
+        logging.debug("Filtering %d events for AI %s. My projects: %s", len(events), ai_id, my_project_ids)
+
+        relevant = _filter_relevant_events(events, ai_id, my_project_ids, limit)
+
+        if cache_key is not None:
+            _cache_relevant(cache_key, relevant)
+
+        return relevant
 
     except Exception as e:
         logging.debug(f"Get relevant events failed: {e}")
@@ -280,7 +465,30 @@ def get_relevant_events(ai_id: str = None, since: datetime = None, limit: int =
 
 # ==================== AMBIENT INJECTION ====================
 
-def format_ambient_update(events: List[Dict]) -> str:
+_AMBIENT_PREFIX = "\n\n[AMBIENT] "
+
+# (epoch minute, 'HH:MM') - strftime only runs once per minute
+_hhmm_cache = (None, '')
+
+def _current_hhmm() -> str:
+    """Current UTC time as HH:MM, cached per minute"""
+    global _hhmm_cache
+    minute = int(time.time() // 60)
+    if _hhmm_cache[0] != minute:
+        _hhmm_cache = (minute, datetime.fromtimestamp(minute * 60, timezone.utc).strftime('%H:%M'))
+    return _hhmm_cache[1]
+
+
+# event_type -> summary template ('e' is the event, extras from metadata)
+_FORMATTERS = {
+    'task_completed': "{e.ai_id} completed #{e.task_id}",
+    'task_created': "{e.ai_id} created urgent #{e.task_id} [p:{priority}]",
+    'task_claimed': "{e.ai_id} claimed #{e.task_id}",
+    'project_created': "{e.ai_id} created {project_name} ({task_count} tasks)",
+    'help_requested': "{e.ai_id} requested help on #{e.task_id}",
+}
+
+def format_ambient_update(events: List[_Event]) -> str:
     """
     Format events into ambient injection string.
 
@@ -289,33 +497,23 @@ def format_ambient_update(events: List[Dict]) -> str:
     if not events:
         return ""
 
-    current_time = datetime.now(timezone.utc).strftime('%H:%M')
-
     # Format each event
     event_summaries = []
+    get_formatter = _FORMATTERS.get
     for event in events:
-        if event['event_type'] == 'task_completed':
-            event_summaries.append(f"{event['ai_id']} completed #{event['task_id']}")
-
-        elif event['event_type'] == 'task_created':
-            priority = event['metadata'].get('priority', 5)
-            event_summaries.append(f"{event['ai_id']} created urgent #{event['task_id']} [p:{priority}]")
-
-        elif event['event_type'] == 'task_claimed':
-            event_summaries.append(f"{event['ai_id']} claimed #{event['task_id']}")
-
-        elif event['event_type'] == 'project_created':
-            task_count = event['metadata'].get('task_count', 0)
-            project_name = event['summary'] or f"project #{event['project_id']}"
-            event_summaries.append(f"{event['ai_id']} created {project_name} ({task_count} tasks)")
+        fmt = get_formatter(event.event_type)
+        if fmt is None:
+            continue
 
-        elif event['event_type'] == 'help_requested':
-            event_summaries.append(f"{event['ai_id']} requested help on #{event['task_id']}")
+        metadata = event.metadata
+        event_summaries.append(fmt.format(
+            e=event,
+            priority=metadata.get('priority', 5),
+            task_count=metadata.get('task_count', 0),
+            project_name=event.summary or f"project #{event.project_id}"
+        ))
 
-    # Join with commas
-    summary = ", ".join(event_summaries)
-
-    return f"\n\n[AMBIENT] {current_time} | {summary}"
+    return _AMBIENT_PREFIX + _current_hhmm() + " | " + ", ".join(event_summaries)
 
 
 def get_ambient_updates(ai_id: str = None) -> str:
@@ -333,26 +531,48 @@ def get_ambient_updates(ai_id: str = None) -> str:
 
 # ==================== INJECTION DECORATOR ====================
 
-# Throttle: Track last injection time per AI
-_last_injection = {}
+# Throttle: Track last injection time per AI (monotonic; bounded LRU, lock-guarded
+# since tool calls may run concurrently)
+_last_injection = OrderedDict()
+_INJECTION_LOCK = threading.Lock()
+_INJECTION_MAX_ENTRIES = 1024
 INJECTION_THROTTLE_SECONDS = 30
 
 def should_inject(ai_id: str = None) -> bool:
-    """Check if we should inject ambient updates (throttle check)"""
+    """Check if we should inject ambient updates (throttle + new-event probe)"""
     ai_id = ai_id or CURRENT_AI_ID
 
-    now = datetime.now(timezone.utc)
-    last = _last_injection.get(ai_id)
+    now = time.monotonic()
 
-    if last is None:
-        _last_injection[ai_id] = now
-        return True
+    with _INJECTION_LOCK:
+        last = _last_injection.get(ai_id)
+
+        if last is not None and now - last < INJECTION_THROTTLE_SECONDS:
+            return False
 
-    if (now - last).total_seconds() >= INJECTION_THROTTLE_SECONDS:
         _last_injection[ai_id] = now
-        return True
+        _last_injection.move_to_end(ai_id)
+        if len(_last_injection) > _INJECTION_MAX_ENTRIES:
+            _last_injection.popitem(last=False)
+
+    # Skip the DB round-trips when nothing has happened since last check
+    return _has_new_events(ai_id)
+
+
+def _fast_ambient_or_none(ai_id: str) -> Optional[str]:
+    """
+    Injection fast path: throttle + new-event probe, then query/format.
 
-    return False
+    Returns None when nothing should be injected.
+    """
+    if not should_inject(ai_id):
+        return None
+
+    events = get_relevant_events(ai_id)
+    if not events:
+        return None
+
+    return format_ambient_update(events)
 
 
 def with_ambient_awareness(func):
@@ -372,14 +592,8 @@ def with_ambient_awareness(func):
         # Execute original function
         result = func(*args, **kwargs)
 
-        # Check if we should inject
-        if not should_inject():
-            return result
-
-        # Get ambient updates
-        ambient = get_ambient_updates()
-
-        if not ambient:
+        ambient = _fast_ambient_or_none(CURRENT_AI_ID)
+        if ambient is None:
             return result
 
         # Inject based on result type
@@ -421,6 +635,8 @@ def check_ambient(**kwargs) -> str:
 
 # ==================== EVENT CLEANUP ====================
 
+CLEANUP_BATCH_SIZE = 10000
+
 def cleanup_old_events(days: int = 7):
     """
     Delete events older than N days.
@@ -437,14 +653,28 @@ def cleanup_old_events(days: int = 7):
 
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
+        deleted = 0
+
         with pool.get_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute('''
-                    DELETE FROM coordination_events WHERE timestamp < %s
-                ''', (cutoff,))
-                deleted = cur.rowcount
-
-                logging.info(f"Cleaned up {deleted} old coordination events")
+                # Delete in bounded chunks, committing each, so a large
+                # backlog doesn't hold one long lock / WAL burst
+                while True:
+                    cur.execute('''
+                        DELETE FROM coordination_events
+                        WHERE ctid = ANY(ARRAY(
+                            SELECT ctid FROM coordination_events
+                            WHERE timestamp < %s
+                            LIMIT %s
+                        ))
+                    ''', (cutoff, CLEANUP_BATCH_SIZE))
+                    conn.commit()
+
+                    if cur.rowcount <= 0:
+                        break
+                    deleted += cur.rowcount
+
+        logging.info(f"Cleaned up {deleted} old coordination events")
 
     except Exception as e:
         logging.error(f"Event cleanup failed: {e}")
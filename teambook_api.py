@@ -8,19 +8,29 @@ Built by AIs, for AIs.
 ==========================================
 """
 
+import os
 import sys
 import json
 import re
 import time
-from collections import Counter
+import heapq
+import queue
+import atexit
+import threading
+import contextvars
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from functools import lru_cache, wraps
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Callable
 
 # Fix import path for src/ structure
 sys.path.insert(0, str(Path(__file__).parent))
 
-# Import shared utilities
+# Import shared utilities (module handle for mutable context like CURRENT_TEAMBOOK)
+import teambook_shared as _ts
 from teambook_shared import (
     CURRENT_TEAMBOOK, CURRENT_AI_ID, OUTPUT_FORMAT,
     MAX_CONTENT_LENGTH, MAX_SUMMARY_LENGTH, DEFAULT_RECENT,
@@ -34,7 +44,6 @@ from teambook_shared import (
 )
 
 from teambook_presence import (
-    presence_snapshot,
     get_presence_overview,
     summarize_presence_categories
 )
@@ -49,13 +58,12 @@ from teambook_storage import (
     _create_all_edges, _detect_or_create_session,
     _calculate_pagerank_if_needed, _resolve_note_id,
     _add_to_vector_store, _search_vectors,
-    collection,
-    _log_operation_to_db
+    collection
 )
 
 # Import Redis pub/sub
 try:
-    from teambook_pubsub import (publish_note_created, publish_note_updated, wait_for_event, subscribe_to_channel, is_redis_available, standby)
+    from teambook_pubsub import (publish_note_created, publish_note_updated, publish_broadcast, wait_for_event, subscribe_to_channel, is_redis_available, standby)
     PUBSUB_AVAILABLE = True
 except ImportError:
     PUBSUB_AVAILABLE = False
@@ -69,6 +77,24 @@ except ImportError:
     CACHE_AVAILABLE = False
     logging.debug("Teambook cache not available")
 
+# Compiled connected-components for graph diagnostics on large teambooks
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    SCIPY_GRAPH_AVAILABLE = True
+except ImportError:
+    SCIPY_GRAPH_AVAILABLE = False
+    logging.debug("scipy not available - graph diagnostics use union-find")
+
+# Faster JSON encoding for observability snapshots
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logging.debug("orjson not available - using json")
+
 # Import storage adapter for PostgreSQL/Redis/DuckDB backend selection
 # CRITICAL: Must use relative import (.storage_adapter) for proper module resolution
 try:
@@ -135,8 +161,61 @@ except ImportError:
         def check_for_duplicate_claim(*args, **kwargs):
             return None
 
+# Short-lived cache for note id resolution (ownership ops resolve the same ids repeatedly)
+try:
+    from performance_utils import CachedResult, get_pooled_connection
+    _note_id_cache = CachedResult(ttl_seconds=5, max_entries=256)
+except ImportError:
+    _note_id_cache = None
+    get_pooled_connection = None
+
+# Output format is fixed at import; resolve the comparison once
+_IS_PIPE = OUTPUT_FORMAT == 'pipe'
+
+# Characters stripped from teambook names and evolution file slugs
+_UNSAFE_NAME_CHARS = re.compile(r'[^a-z0-9_-]')
+
+# Whitespace, quotes and brackets trimmed from either end of a tag
+_TAG_STRIP = re.compile(r'^[\s"\'\[\]]+|[\s"\'\[\]]+$')
+
+# format_time_compact results for list renders, valid for one wall-clock minute
+_time_fmt_cache = {}
+_time_fmt_minute = None
+_TIME_FMT_CACHE_MAX = 1024
+
+def _format_time_cached(ts: Any) -> str:
+    """
+    format_time_compact() memoized per (created minute, current minute).
+
+    Sub-hour ages ("now", "5m") need second precision and are cheap, so
+    they bypass the cache; older timestamps only vary by minute.
+    """
+    global _time_fmt_minute
+    if not isinstance(ts, datetime):
+        return format_time_compact(ts)
+
+    now = time.time()
+    epoch = (ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp()
+    if now - epoch < 3600:
+        return format_time_compact(ts)
+
+    now_minute = int(now // 60)
+    if now_minute != _time_fmt_minute or len(_time_fmt_cache) >= _TIME_FMT_CACHE_MAX:
+        _time_fmt_cache.clear()
+        _time_fmt_minute = now_minute
+
+    key = (int(epoch // 60), ts.utcoffset())
+    formatted = _time_fmt_cache.get(key)
+    if formatted is None:
+        formatted = _time_fmt_cache[key] = format_time_compact(ts)
+    return formatted
+
 # Global storage adapter instance (initialized lazily per teambook)
 _storage_adapters = {}
+_storage_adapters_lock = threading.Lock()
+
+# Last adapter resolved on this thread (teambook_name, adapter)
+_adapter_local = threading.local()
 
 def _get_storage_adapter(teambook_name: str = None) -> 'TeambookStorageAdapter':
     """Get or create storage adapter for the current teambook"""
@@ -150,16 +229,97 @@ def _get_storage_adapter(teambook_name: str = None) -> 'TeambookStorageAdapter':
         teambook_name = CURRENT_TEAMBOOK or 'default'
 
     # Return cached adapter if exists
-    if teambook_name in _storage_adapters:
-        return _storage_adapters[teambook_name]
-
-    # Create new adapter
-    adapter = TeambookStorageAdapter(teambook_name)
-    _storage_adapters[teambook_name] = adapter
+    adapter = _storage_adapters.get(teambook_name)
+    if adapter is None:
+        # Create new adapter (locked: a background warm-up may be racing us)
+        with _storage_adapters_lock:
+            adapter = _storage_adapters.get(teambook_name)
+            if adapter is None:
+                adapter = TeambookStorageAdapter(teambook_name)
+                _storage_adapters[teambook_name] = adapter
+
+    _adapter_local.teambook_name = teambook_name
+    _adapter_local.adapter = adapter
     return adapter
 
+def _current_adapter() -> 'TeambookStorageAdapter':
+    """Adapter for CURRENT_TEAMBOOK, reusing this thread's last binding when it matches"""
+    if getattr(_adapter_local, 'teambook_name', None) == (CURRENT_TEAMBOOK or 'default'):
+        return _adapter_local.adapter
+    return _get_storage_adapter(CURRENT_TEAMBOOK)
+
 # ============= TEAM MANAGEMENT =============
 
+# Teambook registry (private DB) - DDL runs once per process, not per call
+_registry_ready = False
+
+def _ensure_registry(conn):
+    """Create the teambooks registry table on first use"""
+    global _registry_ready
+    if _registry_ready:
+        return
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS teambooks (
+            name VARCHAR PRIMARY KEY,
+            created TIMESTAMPTZ NOT NULL,
+            created_by VARCHAR NOT NULL,
+            last_active TIMESTAMPTZ
+        )
+    ''')
+    _registry_ready = True
+
+def _teambook_db_file(teambook: Optional[str]) -> Path:
+    """DuckDB file of a teambook by name (None = private), whatever the current context"""
+    base = _ts.TEAMBOOK_ROOT / teambook if teambook else _ts.TEAMBOOK_PRIVATE_ROOT
+    return base / "teambook.duckdb"
+
+def _teambook_conn(teambook: Optional[str]):
+    """
+    Connection to a named teambook's DB for background workers.
+
+    Unlike _get_db_conn() this never reads CURRENT_TEAMBOOK, so it stays
+    pointed at the right file while the foreground switches teambooks.
+    """
+    db_file = str(_teambook_db_file(teambook))
+    if get_pooled_connection is not None:
+        return get_pooled_connection(db_file)
+    import duckdb
+    return closing(duckdb.connect(db_file))
+
+# Registry connection shared by nested registry calls within one operation
+_registry_conn_var = contextvars.ContextVar('teambook_registry_conn', default=None)
+
+@contextmanager
+def _registry_conn():
+    """
+    Connection to the private teambooks registry.
+
+    Nested uses (e.g. _auto_connect_town_hall -> _ensure_town_hall ->
+    join_teambook) reuse the outermost connection instead of checking
+    out a new one per statement.
+    """
+    conn = _registry_conn_var.get()
+    if conn is not None:
+        yield conn
+        return
+
+    # Registry lives in the private DB; only switch context to open it
+    old_teambook = _ts.CURRENT_TEAMBOOK
+    _ts.CURRENT_TEAMBOOK = None
+    try:
+        conn_ctx = _get_db_conn()
+    finally:
+        _ts.CURRENT_TEAMBOOK = old_teambook
+
+    with conn_ctx as conn:
+        token = _registry_conn_var.set(conn)
+        try:
+            _ensure_registry(conn)
+            yield conn
+        finally:
+            _registry_conn_var.reset(token)
+
 def create_teambook(name: str = None, **kwargs) -> Dict:
     """Create a new teambook"""
     try:
@@ -168,7 +328,7 @@ def create_teambook(name: str = None, **kwargs) -> Dict:
             return "!create_failed:name_required"
         
         # Sanitize name
-        name = re.sub(r'[^a-z0-9_-]', '', name)
+        name = _UNSAFE_NAME_CHARS.sub('', name)
         if not name:
             return "!create_failed:invalid_name"
         
@@ -181,31 +341,23 @@ def create_teambook(name: str = None, **kwargs) -> Dict:
         (team_dir / "outputs").mkdir(exist_ok=True)
         
         # Initialize team database
-        import teambook_shared
-        old_teambook = teambook_shared.CURRENT_TEAMBOOK
-        teambook_shared.CURRENT_TEAMBOOK = name
+        old_teambook = _ts.CURRENT_TEAMBOOK
+        _ts.CURRENT_TEAMBOOK = name
         
         _init_db()
+        _ts.CURRENT_TEAMBOOK = old_teambook
+
+        # _init_db touched globals for the new teambook's DB
+        global _initialized_for
+        _initialized_for = _NOT_INITIALIZED
         
         # Register in private database
-        teambook_shared.CURRENT_TEAMBOOK = None
-        with _get_db_conn() as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS teambooks (
-                    name VARCHAR PRIMARY KEY,
-                    created TIMESTAMPTZ NOT NULL,
-                    created_by VARCHAR NOT NULL,
-                    last_active TIMESTAMPTZ
-                )
-            ''')
-            
+        with _registry_conn() as conn:
             conn.execute('''
                 INSERT INTO teambooks (name, created, created_by)
                 VALUES (?, ?, ?)
             ''', [name, datetime.now(timezone.utc), CURRENT_AI_ID])
         
-        teambook_shared.CURRENT_TEAMBOOK = old_teambook
-        
         return f"created:{name}"
         
     except Exception as e:
@@ -224,45 +376,82 @@ def join_teambook(name: str = None, **kwargs) -> Dict:
             return f"!join_failed:not_found:{name}"
         
         # Update last active
-        import teambook_shared
-        old_teambook = teambook_shared.CURRENT_TEAMBOOK
-        teambook_shared.CURRENT_TEAMBOOK = None
-        
-        with _get_db_conn() as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS teambooks (
-                    name VARCHAR PRIMARY KEY,
-                    created TIMESTAMPTZ NOT NULL,
-                    created_by VARCHAR NOT NULL,
-                    last_active TIMESTAMPTZ
-                )
-            ''')
-            
+        with _registry_conn() as conn:
             conn.execute(
                 "UPDATE teambooks SET last_active = ? WHERE name = ?",
                 [datetime.now(timezone.utc), name]
             )
         
-        teambook_shared.CURRENT_TEAMBOOK = old_teambook
-        
         return f"joined:{name}"
         
     except Exception as e:
         logging.error(f"Error joining teambook: {e}")
         return f"!join_failed:{str(e)[:50]}"
 
+# Teambook context the DB/vault/vector globals were last initialized for
+_NOT_INITIALIZED = object()
+_initialized_for = _NOT_INITIALIZED
+_vault_ready_for = _NOT_INITIALIZED
+_vectors_ready_for = _NOT_INITIALIZED
+
+def _init_context(name: Optional[str], with_db: bool = True):
+    """Initialize DB globals for a teambook (None = private), skipping repeats.
+
+    Vault and vector store are deferred until first use (_ensure_vault /
+    _ensure_vectors) - opening the vector index is the slow part of a switch
+    and most sessions never touch it.
+    """
+    global _initialized_for
+    if _initialized_for == name:
+        return
+
+    if with_db:
+        _init_db()
+    _initialized_for = name
+
+def _ensure_vault():
+    """Initialize the vault manager for the current teambook on first use"""
+    global _vault_ready_for
+    target = _ts.CURRENT_TEAMBOOK
+    if _vault_ready_for == target and teambook_storage.vault_manager:
+        return
+
+    _init_vault_manager()
+    _vault_ready_for = target
+
+_vectors_lock = threading.RLock()
+# Vector adds for notes whose teambook was switched away from before the
+# post-write worker reached them; requeued when that teambook is reopened
+_deferred_vector_adds: Dict[Optional[str], List[Tuple[int, Dict]]] = {}
+
+def _ensure_vectors():
+    """Open the vector store for the current teambook on first use"""
+    global _vectors_ready_for
+    target = _ts.CURRENT_TEAMBOOK
+    if _vectors_ready_for == target:
+        return
+
+    # Locked: the post-write worker may open it concurrently with a read
+    # (reentrant: the worker already holds it around its check-and-add)
+    deferred = None
+    with _vectors_lock:
+        if _vectors_ready_for != target:
+            _init_vector_db()
+            _vectors_ready_for = target
+            deferred = _deferred_vector_adds.pop(target, None)
+
+    for note_id, note in deferred or ():
+        _enqueue_post_write(note_id, note, vector_only=True)
+
 def use_teambook(name: str = None, **kwargs) -> Dict:
     """Switch to a teambook context"""
     try:
-        import teambook_shared
-        
         name = kwargs.get('name', name)
         
         # Special case: switch to private
         if name == "private" or name == "":
-            teambook_shared.CURRENT_TEAMBOOK = None
-            _init_vault_manager()
-            _init_vector_db()
+            _ts.CURRENT_TEAMBOOK = None
+            _init_context(None, with_db=False)
             return "using:private"
         
         if name:
@@ -272,17 +461,15 @@ def use_teambook(name: str = None, **kwargs) -> Dict:
             if not team_dir.exists():
                 return f"!use_failed:not_found:{name}"
             
-            teambook_shared.CURRENT_TEAMBOOK = name
+            _ts.CURRENT_TEAMBOOK = name
             
-            # Reinitialize for new context
-            _init_db()
-            _init_vault_manager()
-            _init_vector_db()
+            # Reinitialize for new context (no-op if already initialized for it)
+            _init_context(name)
             
             return f"using:{name}"
         else:
             # Return current context
-            current = teambook_shared.CURRENT_TEAMBOOK or "private"
+            current = _ts.CURRENT_TEAMBOOK or "private"
             return f"current:{current}"
         
     except Exception as e:
@@ -292,49 +479,37 @@ def use_teambook(name: str = None, **kwargs) -> Dict:
 def list_teambooks(**kwargs) -> Dict:
     """List available teambooks"""
     try:
-        teambooks = []
-        
-        # Get from registry
-        import teambook_shared
-        old_teambook = teambook_shared.CURRENT_TEAMBOOK
-        teambook_shared.CURRENT_TEAMBOOK = None
-        
-        with _get_db_conn() as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS teambooks (
-                    name VARCHAR PRIMARY KEY,
-                    created TIMESTAMPTZ NOT NULL,
-                    created_by VARCHAR NOT NULL,
-                    last_active TIMESTAMPTZ
-                )
-            ''')
-            
+        # Get from registry (only name + last active are emitted)
+        with _registry_conn() as conn:
             teams = conn.execute(
-                "SELECT name, created, last_active FROM teambooks ORDER BY last_active DESC NULLS LAST"
+                "SELECT name, last_active FROM teambooks ORDER BY last_active DESC NULLS LAST"
             ).fetchall()
-            
-            for name, created, last_active in teams:
-                teambooks.append({
-                    'name': name,
-                    'created': format_time_compact(created),
-                    'active': format_time_compact(last_active) if last_active else "never"
-                })
-        
-        teambook_shared.CURRENT_TEAMBOOK = old_teambook
-
-        # Pure pipe format (token optimized!)
-        if not teambooks:
-            return ""  # Empty = no teambooks
 
-        lines = [f"{t['name']}|{t['active']}" for t in teambooks]
-        return '\n'.join(lines)
+        # Pure pipe format (token optimized!) - empty = no teambooks
+        return '\n'.join(
+            f"{name}|{_format_time_cached(last_active) if last_active else 'never'}"
+            for name, last_active in teams
+        )
 
     except Exception as e:
         logging.error(f"Error listing teambooks: {e}")
         return f"!list_failed:{str(e)[:50]}"
 
+@lru_cache(maxsize=4)
 def _get_town_hall_name(scope: Optional[str] = None) -> str:
-    """Get the appropriate Town Hall teambook name based on configuration"""
+    """
+    Get the appropriate Town Hall teambook name based on configuration.
+
+    Memoized per scope: hostname/env resolution happens once per process.
+    Call _get_town_hall_name.cache_clear() after changing TOWN_HALL_SCOPE.
+
+    Installs can pin the name ahead of time via the TOWN_HALL_NAME env var,
+    which skips resolution entirely for the default scope.
+    """
+    if scope is None:
+        pinned = os.environ.get('TOWN_HALL_NAME', '').strip()
+        if pinned:
+            return pinned
 
     return get_default_teambook_name(scope)
 
@@ -362,9 +537,8 @@ def _ensure_town_hall() -> str:
                 return None
             logging.info(f"✨ Created {town_hall_name} teambook for autonomous discovery")
 
-            import teambook_shared
-            old_teambook = teambook_shared.CURRENT_TEAMBOOK
-            teambook_shared.CURRENT_TEAMBOOK = town_hall_name
+            old_teambook = _ts.CURRENT_TEAMBOOK
+            _ts.CURRENT_TEAMBOOK = town_hall_name
 
             try:
                 scope_label = "this device" if "-" in town_hall_name else "all connected nodes"
@@ -386,48 +560,23 @@ def _ensure_town_hall() -> str:
                     owner='system'
                 )
             finally:
-                teambook_shared.CURRENT_TEAMBOOK = old_teambook
+                _ts.CURRENT_TEAMBOOK = old_teambook
 
         # Ensure we're registered in town-hall
-        import teambook_shared
-        old_teambook = teambook_shared.CURRENT_TEAMBOOK
-        teambook_shared.CURRENT_TEAMBOOK = None
-
-        with _get_db_conn() as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS teambooks (
-                    name VARCHAR PRIMARY KEY,
-                    created TIMESTAMPTZ NOT NULL,
-                    created_by VARCHAR NOT NULL,
-                    last_active TIMESTAMPTZ
-                )
-            ''')
-
-            # Check if we've joined
-            existing = conn.execute(
-                "SELECT name FROM teambooks WHERE name = ?",
-                [town_hall_name]
-            ).fetchone()
-
-            if not existing:
-                # Join town-hall
-                conn.execute('''
-                    INSERT INTO teambooks (name, created, created_by, last_active)
-                    VALUES (?, ?, ?, ?)
-                ''', [town_hall_name, datetime.now(timezone.utc), CURRENT_AI_ID, datetime.now(timezone.utc)])
+        with _registry_conn() as conn:
+            # Join (or refresh last_active) in one statement; a fresh row has created == last_active
+            now = datetime.now(timezone.utc)
+            joined = conn.execute('''
+                INSERT INTO teambooks (name, created, created_by, last_active)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET last_active = EXCLUDED.last_active
+                RETURNING created = last_active
+            ''', [town_hall_name, now, CURRENT_AI_ID, now]).fetchone()
+            if joined and joined[0]:
                 logging.info(f"✨ Joined {town_hall_name} teambook")
-            else:
-                # Update last active
-                conn.execute(
-                    "UPDATE teambooks SET last_active = ? WHERE name = ?",
-                    [datetime.now(timezone.utc), town_hall_name]
-                )
-
-        teambook_shared.CURRENT_TEAMBOOK = old_teambook
 
         # Set town-hall as the current teambook context (persists across commands)
-        from teambook_shared import set_current_teambook
-        set_current_teambook(town_hall_name)
+        _ts.set_current_teambook(town_hall_name)
 
         return town_hall_name
 
@@ -438,61 +587,110 @@ def _ensure_town_hall() -> str:
 def _check_town_hall_connected() -> bool:
     """Check if this AI has connected to any Town Hall"""
     try:
-        import teambook_shared
-        old_teambook = teambook_shared.CURRENT_TEAMBOOK
-        teambook_shared.CURRENT_TEAMBOOK = None
-
-        with _get_db_conn() as conn:
+        # Exact PK probes (pinned/default name and both scopes) instead of a LIKE scan
+        with _registry_conn() as conn:
             result = conn.execute('''
                 SELECT 1 FROM teambooks
-                WHERE name LIKE 'town-hall%'
+                WHERE name IN (?, ?, ?)
                 LIMIT 1
-            ''').fetchone()
+            ''', [
+                _get_town_hall_name(),
+                _get_town_hall_name('computer'),
+                _get_town_hall_name('universal')
+            ]).fetchone()
 
-            teambook_shared.CURRENT_TEAMBOOK = old_teambook
             return result is not None
     except:
         return False
 
+def _announce_in_background(content: str, teambook: str):
+    """
+    Fire-and-forget broadcast to `teambook`'s general channel.
+
+    Publishes straight to that teambook's channel, so it doesn't matter
+    which teambook is current once the thread runs. Non-daemon so the
+    caller doesn't wait on the publish, but a CLI process still delivers
+    it before exit.
+    """
+    if not PUBSUB_AVAILABLE:
+        return
+
+    def _send():
+        publish_broadcast("general", content, teambook=teambook)
+
+    threading.Thread(target=_send, name="town-hall-announce").start()
+
+def _warm_adapter_in_background(teambook_name: str):
+    """Build the storage adapter (pool/handshake) off the foreground path"""
+    if not STORAGE_ADAPTER_AVAILABLE:
+        return
+
+    def _warm():
+        try:
+            _get_storage_adapter(teambook_name)
+        except Exception as e:
+            logging.debug(f"Adapter warm-up failed for {teambook_name}: {e}")
+
+    threading.Thread(target=_warm, name="adapter-warmup", daemon=True).start()
+
 def _auto_connect_town_hall():
     """Auto-connect to Town Hall on first run"""
     try:
-        # Check if already connected
-        if _check_town_hall_connected():
-            return
+        # One registry connection for check + ensure + join
+        with _registry_conn():
+            # Check if already connected
+            if _check_town_hall_connected():
+                return
 
-        # Ensure Town Hall exists
-        town_hall_name = _ensure_town_hall()
-        if not town_hall_name:
-            return
+            # Ensure Town Hall exists
+            town_hall_name = _ensure_town_hall()
+            if not town_hall_name:
+                return
 
-        # Join Town Hall
-        result = join_teambook(name=town_hall_name)
+            # Join Town Hall
+            result = join_teambook(name=town_hall_name)
 
         if result.startswith("joined:"):
             logging.info(f"Auto-connected to {town_hall_name}")
 
             # Switch to Town Hall context
-            import teambook_shared
-            teambook_shared.CURRENT_TEAMBOOK = town_hall_name
+            _ts.CURRENT_TEAMBOOK = town_hall_name
+            _warm_adapter_in_background(town_hall_name)
 
-            # Announce presence
-            try:
-                from teambook_messaging import broadcast
-                # Add emoji only for CLI (not MCP)
-                prefix = "👋 " if IS_CLI else ""
-                broadcast(
-                    content=f"{prefix}{CURRENT_AI_ID} has auto-connected to Town Hall!",
-                    channel="general"
-                )
-            except:
-                pass  # Silent fail if messaging not ready
+            # Announce presence (off the startup path)
+            # Add emoji only for CLI (not MCP)
+            prefix = "👋 " if IS_CLI else ""
+            _announce_in_background(f"{prefix}{CURRENT_AI_ID} has auto-connected to Town Hall!", town_hall_name)
         else:
             logging.warning(f"Failed to auto-connect: {result}")
 
     except Exception as e:
         logging.error(f"Error in auto-connect: {e}")
 
+# Memoized "first connection message already shown" state (None = not checked yet)
+_first_time_shown = None
+
+def _first_connection_pending() -> bool:
+    """True exactly once per install: the first CLI connection, then marks it shown"""
+    global _first_time_shown
+    if _first_time_shown:
+        return False
+
+    flag_path = os.path.join(str(_ts.TEAMBOOK_ROOT), ".first_connection_shown")
+    try:
+        os.stat(flag_path)
+        _first_time_shown = True
+        return False
+    except OSError:
+        pass
+
+    try:
+        open(flag_path, 'a').close()
+    except OSError:
+        pass  # Non-critical
+    _first_time_shown = True
+    return True
+
 def _ensure_connected_with_feedback() -> Optional[str]:
     """
     Ensure connected to town hall with context-aware feedback.
@@ -509,17 +707,12 @@ def _ensure_connected_with_feedback() -> Optional[str]:
         - Message string for CLI first-time
         - None for MCP or subsequent CLI calls
     """
-    import teambook_shared
-
     # Check if already connected to ANY teambook
-    if teambook_shared.CURRENT_TEAMBOOK:
+    if _ts.CURRENT_TEAMBOOK:
         return None  # Already connected
 
     try:
-        # Get town hall name (system-agnostic)
-        town_hall_name = _get_town_hall_name()
-
-        # Ensure town hall exists
+        # Ensure town hall exists (resolves the system-agnostic name)
         town_hall_name = _ensure_town_hall()
         if not town_hall_name:
             return None  # Silent failure (logged)
@@ -532,22 +725,13 @@ def _ensure_connected_with_feedback() -> Optional[str]:
 
         # Connection successful - decide on feedback based on context
 
-        if teambook_shared.IS_MCP:
+        if _ts.IS_MCP:
             # MCP: Always silent (status shown via get_status)
             return None
 
         else:  # CLI mode
-            # Check for first-time flag
-            flag_file = teambook_shared.TEAMBOOK_ROOT / ".first_connection_shown"
-            is_first_time = not flag_file.exists()
-
-            if is_first_time:
-                # Create flag file
-                try:
-                    flag_file.touch()
-                except:
-                    pass  # Non-critical
-
+            # Check for first-time flag (stat'd at most once per process)
+            if _first_connection_pending():
                 # Return friendly message (CLI first time only)
                 return f"Connected to {town_hall_name}"
             else:
@@ -562,47 +746,37 @@ def _ensure_connected_with_feedback() -> Optional[str]:
 def connect_town_hall(**kwargs) -> Dict:
     """Manually connect to Town Hall (useful for existing instances)"""
     try:
-        # Ensure and connect
-        town_hall_name = _ensure_town_hall()
-        if not town_hall_name:
-            return "!connect_failed:ensure_failed"
+        # One registry connection for ensure + check + join
+        with _registry_conn():
+            # Ensure and connect
+            town_hall_name = _ensure_town_hall()
+            if not town_hall_name:
+                return "!connect_failed:ensure_failed"
+
+            already_connected = _check_town_hall_connected()
+            if not already_connected:
+                result = join_teambook(name=town_hall_name)
 
         # Check if already connected
-        if _check_town_hall_connected():
+        if already_connected:
             # Switch to Town Hall
-            import teambook_shared
-            teambook_shared.CURRENT_TEAMBOOK = town_hall_name
-
-            _init_db()
-            _init_vault_manager()
-            _init_vector_db()
+            _ts.CURRENT_TEAMBOOK = town_hall_name
+            _init_context(town_hall_name)
 
             return f"already_connected:{town_hall_name}|Now using Town Hall"
 
-        # Join Town Hall
-        result = join_teambook(name=town_hall_name)
+        # Joined Town Hall above
         if not result.startswith("joined:"):
             return f"!connect_failed:{result}"
 
         # Switch to Town Hall
-        import teambook_shared
-        teambook_shared.CURRENT_TEAMBOOK = town_hall_name
-
-        _init_db()
-        _init_vault_manager()
-        _init_vector_db()
+        _ts.CURRENT_TEAMBOOK = town_hall_name
+        _init_context(town_hall_name)
 
-        # Announce presence
-        try:
-            from teambook_messaging import broadcast
-            # Add emoji only for CLI (not MCP)
-            prefix = "👋 " if IS_CLI else ""
-            broadcast(
-                content=f"{prefix}{CURRENT_AI_ID} manually connected to Town Hall!",
-                channel="general"
-            )
-        except:
-            pass
+        # Announce presence (off the request path)
+        # Add emoji only for CLI (not MCP)
+        prefix = "👋 " if IS_CLI else ""
+        _announce_in_background(f"{prefix}{CURRENT_AI_ID} manually connected to Town Hall!", town_hall_name)
 
         return f"connected:{town_hall_name}|Successfully joined Town Hall"
 
@@ -612,30 +786,57 @@ def connect_town_hall(**kwargs) -> Dict:
 
 # ============= OWNERSHIP COMMANDS =============
 
+# Note columns shown by get_full_note (backend bookkeeping is never fetched)
+_NOTE_USER_COLS = (
+    'id', 'content', 'summary', 'tags', 'pinned', 'author', 'owner',
+    'created', 'representation_policy', 'metadata'
+)
+
+_FULL_NOTE_SQL = (
+    f"SELECT {', '.join('n.' + c for c in _NOTE_USER_COLS)}, "
+    "(SELECT array_agg(e.name) FROM entity_notes en JOIN entities e ON e.id = en.entity_id "
+    "WHERE en.note_id = n.id) AS entities "
+    "FROM notes n WHERE n.id = ?"
+)
+
+def _resolve_note_id_cached(id_param: Any) -> Optional[int]:
+    """_resolve_note_id with a 5s per-teambook cache for scalar ids"""
+    if _note_id_cache is None or not isinstance(id_param, (int, str)):
+        return _resolve_note_id(id_param)
+
+    key = (_ts.CURRENT_TEAMBOOK, id_param)
+    note_id = _note_id_cache.get(key)
+    if note_id is None:
+        note_id = _resolve_note_id(id_param)
+        if note_id:
+            _note_id_cache.set(key, note_id)
+    return note_id
+
+def _invalidate_note_id_cache():
+    """Drop cached id resolutions ('last' etc.) after notes are created/deleted"""
+    if _note_id_cache is not None:
+        _note_id_cache.clear()
+
 def claim(id: Any = None, **kwargs) -> Dict:
     """Claim ownership of an item"""
     try:
-        note_id = _resolve_note_id(kwargs.get('id', id))
+        note_id = _resolve_note_id_cached(kwargs.get('id', id))
         if not note_id:
             return "!claim_failed:invalid_id"
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         note_data = None
 
         if adapter:
             try:
-                note_data = adapter.get_note(note_id)
+                outcome, note_data = adapter.try_claim(note_id, CURRENT_AI_ID)
 
-                if not note_data:
+                if outcome == 'not_found':
                     return f"!claim_failed:not_found:{note_id}"
-
-                owner = note_data.get('owner')
-                if owner and owner != CURRENT_AI_ID:
-                    return f"!claim_failed:owned_by:{owner}"
-
-                success = adapter.update_note(note_id, owner=CURRENT_AI_ID)
-                if not success:
+                if outcome == 'owned_by':
+                    return f"!claim_failed:owned_by:{note_data.get('owner')}"
+                if outcome != 'claimed':
                     return f"!claim_failed:update_failed:{note_id}"
 
                 summary = note_data.get('summary') or simple_summary(note_data.get('content', ''), 100)
@@ -647,28 +848,21 @@ def claim(id: Any = None, **kwargs) -> Dict:
         # Fallback to DuckDB if adapter failed
         if not note_data:
             with _get_db_conn() as conn:
+                # Ownership precondition enforced by the UPDATE itself
                 note = conn.execute(
-                    "SELECT owner, summary, content FROM notes WHERE id = ?",
-                    [note_id]
+                    "UPDATE notes SET owner = ? WHERE id = ? AND (owner IS NULL OR owner = ?) RETURNING summary, content",
+                    [CURRENT_AI_ID, note_id, CURRENT_AI_ID]
                 ).fetchone()
 
                 if not note:
-                    return f"!claim_failed:not_found:{note_id}"
-
-                if note[0] and note[0] != CURRENT_AI_ID:
-                    return f"!claim_failed:owned_by:{note[0]}"
-
-                conn.execute(
-                    "UPDATE notes SET owner = ? WHERE id = ?",
-                    [CURRENT_AI_ID, note_id]
-                )
+                    owner = conn.execute("SELECT owner FROM notes WHERE id = ?", [note_id]).fetchone()
+                    if not owner:
+                        return f"!claim_failed:not_found:{note_id}"
+                    return f"!claim_failed:owned_by:{owner[0]}"
 
-                summary = note[1] or simple_summary(note[2], 100)
+                summary = note[0] or simple_summary(note[1], 100)
 
-        if OUTPUT_FORMAT == 'pipe':
-            return f"claimed:{note_id}|{summary}"
-        else:
-            return f"claimed:{note_id}|{summary}"
+        return f"claimed:{note_id}|{summary}"
 
     except Exception as e:
         logging.error(f"Error claiming: {e}")
@@ -677,12 +871,12 @@ def claim(id: Any = None, **kwargs) -> Dict:
 def release(id: Any = None, **kwargs) -> Dict:
     """Release ownership of an item"""
     try:
-        note_id = _resolve_note_id(kwargs.get('id', id))
+        note_id = _resolve_note_id_cached(kwargs.get('id', id))
         if not note_id:
             return "!error:invalid_id"
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         released = False
 
         if adapter:
@@ -708,22 +902,17 @@ def release(id: Any = None, **kwargs) -> Dict:
         # Fallback to DuckDB if adapter failed
         if not released:
             with _get_db_conn() as conn:
-                owner = conn.execute(
-                    "SELECT owner FROM notes WHERE id = ?",
-                    [note_id]
+                released_row = conn.execute(
+                    "UPDATE notes SET owner = NULL WHERE id = ? AND owner = ? RETURNING id",
+                    [note_id, CURRENT_AI_ID]
                 ).fetchone()
 
-                if not owner:
-                    return f"!release_failed:not_found:{note_id}"
-
-                if owner[0] != CURRENT_AI_ID:
+                if not released_row:
+                    exists = conn.execute("SELECT 1 FROM notes WHERE id = ?", [note_id]).fetchone()
+                    if not exists:
+                        return f"!release_failed:not_found:{note_id}"
                     return "!release_failed:not_yours"
 
-                conn.execute(
-                    "UPDATE notes SET owner = NULL WHERE id = ?",
-                    [note_id]
-                )
-
         return f"released:{note_id}"
 
     except Exception as e:
@@ -733,7 +922,7 @@ def release(id: Any = None, **kwargs) -> Dict:
 def assign(id: Any = None, to: str = None, **kwargs) -> Dict:
     """Assign an item to another AI"""
     try:
-        note_id = _resolve_note_id(kwargs.get('id', id))
+        note_id = _resolve_note_id_cached(kwargs.get('id', id))
         to_ai = kwargs.get('to', to)
 
         if not note_id:
@@ -742,7 +931,7 @@ def assign(id: Any = None, to: str = None, **kwargs) -> Dict:
             return "!assign_failed:recipient_required"
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         assigned = False
 
         if adapter:
@@ -768,31 +957,76 @@ def assign(id: Any = None, to: str = None, **kwargs) -> Dict:
         # Fallback to DuckDB if adapter failed
         if not assigned:
             with _get_db_conn() as conn:
-                owner = conn.execute(
-                    "SELECT owner FROM notes WHERE id = ?",
-                    [note_id]
+                assigned_row = conn.execute(
+                    "UPDATE notes SET owner = ? WHERE id = ? AND (owner IS NULL OR owner = ?) RETURNING id",
+                    [str(to_ai), note_id, CURRENT_AI_ID]
                 ).fetchone()
 
-                if not owner:
-                    return f"!error:not_found:{note_id}"
-
-                if owner[0] and owner[0] != CURRENT_AI_ID:
+                if not assigned_row:
+                    exists = conn.execute("SELECT 1 FROM notes WHERE id = ?", [note_id]).fetchone()
+                    if not exists:
+                        return f"!error:not_found:{note_id}"
                     return "!assign_failed:not_yours"
-
-                conn.execute(
-                    "UPDATE notes SET owner = ? WHERE id = ?",
-                    [to_ai, note_id]
-                )
         
-        if OUTPUT_FORMAT == 'pipe':
-            return f"assigned:{note_id}|{to_ai}"
-        else:
-            return f"assigned:{note_id}|{to_ai}"
+        return f"assigned:{note_id}|{to_ai}"
         
     except Exception as e:
         logging.error(f"Error assigning: {e}")
         return f"!assign_failed:{str(e)[:50]}"
 
+# ============= ID ALLOCATION =============
+
+# (teambook, table) pairs whose allocation sequence is synced this process
+_id_sequences_ready = set()
+
+def _ensure_id_sequence(conn, table: str, resync: bool = False) -> str:
+    """
+    Get the id allocation sequence for a table, (re)starting it past MAX(id).
+
+    DuckDB has no setval/ALTER SEQUENCE RESTART, so the sequence is
+    replaced once per process (and on conflict) rather than kept in step.
+    """
+    key = (_ts.CURRENT_TEAMBOOK, table)
+    seq = f"{table}_alloc_seq"
+
+    if resync or key not in _id_sequences_ready:
+        max_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        conn.execute(f"CREATE OR REPLACE SEQUENCE {seq} START WITH {max_id + 1}")
+        _id_sequences_ready.add(key)
+
+    return seq
+
+@lru_cache(maxsize=64)
+def _insert_sql(table: str, seq: str, columns: Tuple[str, ...], row_count: int) -> str:
+    """Build (once) the multi-row INSERT ... RETURNING id text for a table/column shape"""
+    row_sql = f"(nextval('{seq}'), {', '.join(['?'] * len(columns))})"
+    return (
+        f"INSERT INTO {table} (id, {', '.join(columns)}) "
+        f"VALUES {', '.join([row_sql] * row_count)} RETURNING id"
+    )
+
+def _insert_rows_with_new_ids(conn, table: str, columns: List[str], rows: List[List[Any]]) -> List[int]:
+    """INSERT rows with sequence-allocated ids in one multi-row statement, returning the ids"""
+    seq = _ensure_id_sequence(conn, table)
+    sql = _insert_sql(table, seq, tuple(columns), len(rows))
+    params = [value for row in rows for value in row]
+
+    try:
+        new_ids = [r[0] for r in conn.execute(sql, params).fetchall()]
+    except Exception as e:
+        # Another writer (storage adapter, other process) took ids past the sequence
+        if 'duplicate key' not in str(e).lower():
+            raise
+        _ensure_id_sequence(conn, table, resync=True)
+        new_ids = [r[0] for r in conn.execute(sql, params).fetchall()]
+
+    _invalidate_note_id_cache()
+    return new_ids
+
+def _insert_with_new_id(conn, table: str, columns: List[str], values: List[Any]) -> int:
+    """INSERT a row with a sequence-allocated id in one statement, returning the id"""
+    return _insert_rows_with_new_ids(conn, table, columns, [values])[0]
+
 # ============= EVOLUTION PATTERN =============
 
 def evolve(goal: str = None, output: str = None, **kwargs) -> Dict:
@@ -805,45 +1039,80 @@ def evolve(goal: str = None, output: str = None, **kwargs) -> Dict:
             return "!evolve_failed:goal_required"
         
         if not output_file:
-            safe_goal = re.sub(r'[^a-z0-9_-]', '', goal.lower()[:30])
+            safe_goal = _UNSAFE_NAME_CHARS.sub('', goal.lower()[:30])
             output_file = f"{safe_goal}_{int(time.time())}.txt"
         
+        now = datetime.now(timezone.utc)
         with _get_db_conn() as conn:
-            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
-            evo_id = max_id + 1
-            
-            conn.execute('''
-                INSERT INTO notes (
-                    id, content, summary, type, author, owner,
-                    teambook_name, created, pinned
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', [
-                evo_id,
+            evo_id = _insert_with_new_id(conn, 'notes', [
+                'content', 'summary', 'type', 'author', 'owner',
+                'teambook_name', 'created', 'pinned'
+            ], [
                 f"EVOLUTION: {goal}\nOutput: {output_file}",
                 f"Evolution: {goal[:100]}",
                 "evolution",
                 CURRENT_AI_ID,
                 CURRENT_AI_ID,
                 CURRENT_TEAMBOOK,
-                datetime.now(timezone.utc),
+                now,
                 False
             ])
             
-            max_eo_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM evolution_outputs").fetchone()[0]
-            conn.execute('''
-                INSERT INTO evolution_outputs (id, evolution_id, output_path, created, author)
-                VALUES (?, ?, ?, ?, ?)
-            ''', [max_eo_id + 1, evo_id, output_file, datetime.now(timezone.utc), CURRENT_AI_ID])
+            _insert_with_new_id(
+                conn, 'evolution_outputs',
+                ['evolution_id', 'output_path', 'created', 'author'],
+                [evo_id, output_file, now, CURRENT_AI_ID]
+            )
         
-        if OUTPUT_FORMAT == 'pipe':
-            return f"evo:{evo_id}|{output_file}"
-        else:
-            return f"evo:{evo_id}|{output_file}"
+        return f"evo:{evo_id}|{output_file}"
         
     except Exception as e:
         logging.error(f"Error starting evolution: {e}")
         return f"!evolve_failed:{str(e)[:50]}"
 
+def _parse_evo_id(evo_id: Any) -> Optional[int]:
+    """Accept 'evo:N' or N"""
+    if isinstance(evo_id, str) and evo_id.startswith('evo:'):
+        return int(evo_id[4:])
+    return int(evo_id) if evo_id else None
+
+def _insert_attempts(conn, evo_id: int, contents: List[str]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Insert attempts for an evolution in one statement.
+    Returns [(attempt_num, attempt_id), ...] or None if the evolution doesn't exist.
+    """
+    # Existence check and attempt count in one round-trip
+    row = conn.execute('''
+        SELECT (SELECT COUNT(*) FROM notes WHERE parent_id = ? AND type = 'attempt')
+        FROM notes WHERE id = ? AND type = 'evolution'
+    ''', [evo_id, evo_id]).fetchone()
+
+    if not row:
+        return None
+
+    first_num = row[0] + 1
+    now = datetime.now(timezone.utc)
+    rows = [
+        [
+            content,
+            f"Attempt {num} for evo:{evo_id}",
+            "attempt",
+            evo_id,
+            CURRENT_AI_ID,
+            CURRENT_AI_ID,
+            CURRENT_TEAMBOOK,
+            now
+        ]
+        for num, content in enumerate(contents, first_num)
+    ]
+
+    attempt_ids = _insert_rows_with_new_ids(conn, 'notes', [
+        'content', 'summary', 'type', 'parent_id', 'author', 'owner',
+        'teambook_name', 'created'
+    ], rows)
+
+    return list(zip(range(first_num, first_num + len(rows)), attempt_ids))
+
 def attempt(evo_id: Any = None, content: str = None, **kwargs) -> Dict:
     """Make an attempt at an evolution"""
     try:
@@ -854,98 +1123,79 @@ def attempt(evo_id: Any = None, content: str = None, **kwargs) -> Dict:
             return "!attempt_failed:content_required"
         
         # Parse evolution ID
-        if isinstance(evo_id, str) and evo_id.startswith('evo:'):
-            evo_id = int(evo_id[4:])
-        else:
-            evo_id = int(evo_id) if evo_id else None
+        evo_id = _parse_evo_id(evo_id)
         
         if not evo_id:
             return "!attempt_failed:evo_id_required"
         
         with _get_db_conn() as conn:
-            evolution = conn.execute(
-                "SELECT id, summary FROM notes WHERE id = ? AND type = 'evolution'",
-                [evo_id]
-            ).fetchone()
-            
-            if not evolution:
-                return f"!attempt_failed:evo_not_found:{evo_id}"
-            
-            attempt_count = conn.execute(
-                "SELECT COUNT(*) FROM notes WHERE parent_id = ? AND type = 'attempt'",
-                [evo_id]
-            ).fetchone()[0]
-            
-            attempt_num = attempt_count + 1
-            
-            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
-            attempt_id = max_id + 1
-            
-            conn.execute('''
-                INSERT INTO notes (
-                    id, content, summary, type, parent_id, author, owner,
-                    teambook_name, created
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', [
-                attempt_id,
-                content,
-                f"Attempt {attempt_num} for evo:{evo_id}",
-                "attempt",
-                evo_id,
-                CURRENT_AI_ID,
-                CURRENT_AI_ID,
-                CURRENT_TEAMBOOK,
-                datetime.now(timezone.utc)
-            ])
+            created = _insert_attempts(conn, evo_id, [content])
         
-        if OUTPUT_FORMAT == 'pipe':
-            return f"attempt:{evo_id}.{attempt_num}|{attempt_id}"
-        else:
-            return f"attempt:{evo_id}.{attempt_num}|{attempt_id}"
+        if created is None:
+            return f"!attempt_failed:evo_not_found:{evo_id}"
+        
+        attempt_num, attempt_id = created[0]
+        return f"attempt:{evo_id}.{attempt_num}|{attempt_id}"
         
     except Exception as e:
         logging.error(f"Error creating attempt: {e}")
         return f"!attempt_failed:{str(e)[:50]}"
 
+def create_attempts(evo_id: Any = None, contents: List[str] = None, **kwargs) -> Dict:
+    """Make several attempts at an evolution in one batch"""
+    try:
+        evo_id = kwargs.get('evo_id', evo_id)
+        contents = kwargs.get('contents', contents) or []
+        contents = [str(c).strip() for c in contents if c and str(c).strip()]
+        
+        if not contents:
+            return "!attempt_failed:content_required"
+        if len(contents) > _ts.BATCH_MAX:
+            return f"!attempt_failed:max_exceeded:{_ts.BATCH_MAX}"
+        
+        evo_id = _parse_evo_id(evo_id)
+        
+        if not evo_id:
+            return "!attempt_failed:evo_id_required"
+        
+        with _get_db_conn() as conn:
+            created = _insert_attempts(conn, evo_id, contents)
+        
+        if created is None:
+            return f"!attempt_failed:evo_not_found:{evo_id}"
+        
+        return '\n'.join(f"attempt:{evo_id}.{num}|{aid}" for num, aid in created)
+        
+    except Exception as e:
+        logging.error(f"Error creating attempts: {e}")
+        return f"!attempt_failed:{str(e)[:50]}"
+
 def attempts(evo_id: Any = None, **kwargs) -> Dict:
     """List all attempts for an evolution"""
     try:
         evo_id = kwargs.get('evo_id', evo_id)
         
-        if isinstance(evo_id, str) and evo_id.startswith('evo:'):
-            evo_id = int(evo_id[4:])
-        else:
-            evo_id = int(evo_id) if evo_id else None
+        evo_id = _parse_evo_id(evo_id)
         
         if not evo_id:
             return "!error:evo_id_required"
         
         with _get_db_conn() as conn:
             attempt_list = conn.execute('''
-                SELECT id, author, created, summary
+                SELECT id, author, created
                 FROM notes 
                 WHERE parent_id = ? AND type = 'attempt'
-                ORDER BY created
+                ORDER BY created, id
             ''', [evo_id]).fetchall()
             
             if not attempt_list:
                 return ""  # No attempts
             
-            if OUTPUT_FORMAT == 'pipe':
-                lines = []
-                for i, (aid, author, created, summary) in enumerate(attempt_list, 1):
-                    lines.append(f"{evo_id}.{i}|{aid}|{author}|{format_time_compact(created)}")
-                return '\n'.join(lines)
-            else:
-                results = []
-                for i, (aid, author, created, summary) in enumerate(attempt_list, 1):
-                    results.append({
-                        "num": f"{evo_id}.{i}",
-                        "id": aid,
-                        "author": author,
-                        "time": format_time_compact(created)
-                    })
-                return '\n'.join([f"{r['num']}|{r['id']}|{r['author']}|{r['time']}" for r in results])
+            # Same line format in both output modes
+            return '\n'.join(
+                f"{evo_id}.{i}|{aid}|{author}|{_format_time_cached(created)}"
+                for i, (aid, author, created) in enumerate(attempt_list, 1)
+            )
         
     except Exception as e:
         logging.error(f"Error listing attempts: {e}")
@@ -958,10 +1208,7 @@ def combine(evo_id: Any = None, use: List[Any] = None, comment: str = None, **kw
         use_ids = kwargs.get('use', use) or []
         comment = kwargs.get('comment', comment)
         
-        if isinstance(evo_id, str) and evo_id.startswith('evo:'):
-            evo_id = int(evo_id[4:])
-        else:
-            evo_id = int(evo_id) if evo_id else None
+        evo_id = _parse_evo_id(evo_id)
         
         if not evo_id:
             return "!error:evo_id_required"
@@ -977,35 +1224,46 @@ def combine(evo_id: Any = None, use: List[Any] = None, comment: str = None, **kw
             
             output_file = output_info[0]
             
+            # All attempts for this evolution, numbered once (evo:N.M -> M)
+            by_num = {}
+            by_id = {}
+            if use_ids:
+                for aid, num, content, author in conn.execute('''
+                    SELECT id, row_number() OVER (ORDER BY created, id), content, author
+                    FROM notes
+                    WHERE parent_id = ? AND type = 'attempt'
+                ''', [evo_id]).fetchall():
+                    by_num[num] = aid
+                    by_id[aid] = (content, author)
+            
             # Parse attempt IDs
             attempt_ids = []
             for uid in use_ids:
                 if isinstance(uid, str) and '.' in uid:
                     parts = uid.split('.')
                     attempt_num = int(parts[-1]) if parts[-1].isdigit() else 0
-                    if attempt_num > 0:
-                        attempt = conn.execute('''
-                            SELECT id FROM notes 
-                            WHERE parent_id = ? AND type = 'attempt'
-                            ORDER BY created
-                            LIMIT 1 OFFSET ?
-                        ''', [evo_id, attempt_num - 1]).fetchone()
-                        if attempt:
-                            attempt_ids.append(attempt[0])
+                    if attempt_num in by_num:
+                        attempt_ids.append(by_num[attempt_num])
                 else:
                     attempt_ids.append(int(uid))
+            attempt_ids = list(dict.fromkeys(attempt_ids))
             
-            # Get attempt contents
-            contents = []
-            if attempt_ids:
-                placeholders = ','.join(['?'] * len(attempt_ids))
-                attempts_data = conn.execute(f'''
+            # Raw note ids outside this evolution's attempts still need a lookup
+            missing = [aid for aid in attempt_ids if aid not in by_id]
+            if missing:
+                placeholders = ','.join(['?'] * len(missing))
+                for aid, content, author in conn.execute(f'''
                     SELECT id, content, author 
                     FROM notes 
                     WHERE id IN ({placeholders})
-                ''', attempt_ids).fetchall()
-                
-                for aid, content, author in attempts_data:
+                ''', missing).fetchall():
+                    by_id[aid] = (content, author)
+            
+            # Get attempt contents
+            contents = []
+            for aid in attempt_ids:
+                if aid in by_id:
+                    content, author = by_id[aid]
                     contents.append(f"# Attempt {aid} by {author}\n\n{content}\n\n")
             
             # Combine content
@@ -1013,28 +1271,32 @@ def combine(evo_id: Any = None, use: List[Any] = None, comment: str = None, **kw
             if comment:
                 final_content = f"# {comment}\n\n{final_content}"
             
-            # Write to output file
+            # Write to output file (no transaction open: reads above autocommitted)
             output_path = get_outputs_dir() / output_file
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write(final_content)
             
-            # Clean up attempts
-            attempt_count = conn.execute(
-                "DELETE FROM notes WHERE parent_id = ? AND type = 'attempt'",
-                [evo_id]
-            ).rowcount
-            
-            # Update evolution status
-            conn.execute('''
-                UPDATE notes 
-                SET content = content || '\n\nCOMPLETE: ' || ?
-                WHERE id = ? AND type = 'evolution'
-            ''', [output_file, evo_id])
+            # Clean up attempts + mark evolution complete in one transaction (one commit)
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                attempt_count = conn.execute(
+                    "DELETE FROM notes WHERE parent_id = ? AND type = 'attempt'",
+                    [evo_id]
+                ).rowcount
+                
+                # Update evolution status
+                conn.execute('''
+                    UPDATE notes 
+                    SET content = content || '\n\nCOMPLETE: ' || ?
+                    WHERE id = ? AND type = 'evolution'
+                ''', [output_file, evo_id])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            _invalidate_note_id_cache()
         
-        if OUTPUT_FORMAT == 'pipe':
-            return f"combined:{output_file}|cleaned:{attempt_count}"
-        else:
-            return f"combined:{output_file}|cleaned:{attempt_count}"
+        return f"combined:{output_file}|cleaned:{attempt_count}"
         
     except Exception as e:
         logging.error(f"Error combining: {e}")
@@ -1042,46 +1304,52 @@ def combine(evo_id: Any = None, use: List[Any] = None, comment: str = None, **kw
 
 # ============= CORE FUNCTIONS =============
 
-def write(content: str = None, summary: str = None, tags: List[str] = None,
-          linked_items: List[str] = None, **kwargs) -> Dict:
-    """Write content to teambook"""
-    try:
-        start = datetime.now(timezone.utc)
-        content = str(kwargs.get('content', content or '')).strip()
-        if not content:
-            content = f"Checkpoint {datetime.now(timezone.utc).strftime('%H:%M')}"
-
-        truncated = False
-        orig_len = len(content)
-        if orig_len > MAX_CONTENT_LENGTH:
-            content = content[:MAX_CONTENT_LENGTH]
-            truncated = True
-
-        summary = clean_text(summary)[:MAX_SUMMARY_LENGTH] if summary else simple_summary(content)
-
-        # Extract project coordination parameters
-        note_type = kwargs.get('type', None)
-        parent_id = kwargs.get('parent_id', None)
-        owner_override = kwargs.get('owner', 'default')  # 'default' means use CURRENT_AI_ID
-        representation_policy = (kwargs.get('representation_policy') or 'default').strip().lower()
-        metadata_payload = kwargs.get('metadata')
-        # Normalize tags parameter - convert string 'null' to None for forgiving tool calls
-        tags = normalize_param(tags)
-        linked_items = normalize_param(linked_items)
-
+def _clean_tag(tag: str) -> str:
+    """Lowercase a tag and trim surrounding whitespace/quotes/brackets"""
+    tag = tag.lower()
+    return tag if tag.isalnum() else _TAG_STRIP.sub('', tag)
+
+def _prepare_note(content: Any, summary: Any, tags: Any, linked_items: Any, kwargs: Dict,
+                  now: datetime = None) -> Dict:
+    """Normalize write() arguments into the fields stored for a note"""
+    content = str(kwargs.get('content', content or '')).strip()
+    if not content:
+        content = f"Checkpoint {(now or datetime.now(timezone.utc)).strftime('%H:%M')}"
+
+    truncated = False
+    orig_len = len(content)
+    if orig_len > MAX_CONTENT_LENGTH:
+        content = content[:MAX_CONTENT_LENGTH]
+        truncated = True
+
+    summary = clean_text(summary)[:MAX_SUMMARY_LENGTH] if summary else simple_summary(content)
+
+    # Extract project coordination parameters
+    note_type = kwargs.get('type', None)
+    parent_id = kwargs.get('parent_id', None)
+    owner_override = kwargs.get('owner', 'default')  # 'default' means use CURRENT_AI_ID
+    representation_policy = (kwargs.get('representation_policy') or 'default').strip().lower()
+    metadata_payload = kwargs.get('metadata')
+    # Normalize tags parameter - convert string 'null' to None for forgiving tool calls
+    tags = normalize_param(tags)
+    linked_items = normalize_param(linked_items)
+
+    if tags is None and linked_items is None:
+        # Common case: nothing to parse
+        tags, linked_items = [], []
+    else:
         # Handle tags: convert string to list if needed (defensive parsing for MCP)
         if tags:
             if isinstance(tags, str):
                 # Try to parse as JSON first (for MCP that sends '["tag1","tag2"]')
                 try:
-                    import json
                     tags = json.loads(tags)
                 except (json.JSONDecodeError, ValueError):
                     # Not JSON - split by comma or treat as single tag
                     tags = [t.strip() for t in tags.split(',')] if ',' in tags else [tags]
 
             # Clean up each tag - remove quotes, brackets, extra whitespace
-            tags = [str(t).lower().strip().strip('"').strip("'").strip('[').strip(']') for t in tags if t]
+            tags = [_clean_tag(str(t)) for t in tags if t]
         else:
             tags = []
 
@@ -1099,151 +1367,557 @@ def write(content: str = None, summary: str = None, tags: List[str] = None,
             linked_items_list = []
         linked_items = linked_items_list
 
-        owner_hint = CURRENT_AI_ID if owner_override == 'default' else owner_override
-        metadata_payload = attach_security_envelope(
-            metadata_payload,
-            {
-                'ai_id': CURRENT_AI_ID,
-                'teambook': CURRENT_TEAMBOOK,
-                'content': content,
-                'summary': summary,
-                'tags': tags,
-                'linked_items': linked_items,
-                'note_type': note_type,
-                'owner': owner_hint,
-                'representation_policy': representation_policy,
-            },
-            purpose='teambook.note.write'
-        )
+    owner_hint = CURRENT_AI_ID if owner_override == 'default' else owner_override
+    metadata_payload = attach_security_envelope(
+        metadata_payload,
+        {
+            'ai_id': CURRENT_AI_ID,
+            'teambook': CURRENT_TEAMBOOK,
+            'content': content,
+            'summary': summary,
+            'tags': tags,
+            'linked_items': linked_items,
+            'note_type': note_type,
+            'owner': owner_hint,
+            'representation_policy': representation_policy,
+        },
+        purpose='teambook.note.write'
+    )
+
+    return {
+        'content': content,
+        'summary': summary,
+        'tags': tags,
+        'linked_items': linked_items,
+        # Serialized once; shared by the adapter call, the row and the tamper hash
+        'linked_items_json': json.dumps(linked_items) if linked_items else None,
+        'note_type': note_type,
+        'parent_id': parent_id,
+        'owner_override': owner_override,
+        'representation_policy': representation_policy,
+        'metadata': metadata_payload,
+        'truncated': truncated,
+        'orig_len': orig_len,
+    }
+
+def _write_note_via_adapter(adapter, note: Dict) -> int:
+    """Write a prepared note through the storage adapter"""
+    return adapter.write_note(
+        content=note['content'],
+        summary=note['summary'],
+        tags=note['tags'],
+        pinned=False,
+        linked_items=note['linked_items_json'],
+        owner=None,  # Will use CURRENT_AI_ID in backend
+        note_type=note['note_type'],
+        parent_id=note['parent_id'],
+        representation_policy=note['representation_policy'],
+        metadata=note['metadata']
+    )
+
+# Columns written by the direct DuckDB path (id is allocated separately)
+_NOTE_INSERT_COLUMNS = [
+    'content', 'content_compressed', 'summary', 'tags', 'pinned', 'author', 'owner',
+    'teambook_name', 'type', 'parent_id', 'created', 'session_id', 'linked_items',
+    'representation_policy', 'pagerank', 'has_vector', 'metadata', 'tamper_hash'
+]
+
+def _note_row_values(note: Dict, created: datetime) -> List[Any]:
+    """Values for _NOTE_INSERT_COLUMNS for a prepared note"""
+    owner_override = note['owner_override']
+    content = note['content']
+    summary = note['summary']
+    tags = note['tags']
+    linked_items_json = note['linked_items_json']
+    representation_policy = note['representation_policy']
+    metadata_payload = note['metadata']
+
+    # Determine owner (None for claimable tasks, CURRENT_AI_ID otherwise)
+    if owner_override == 'default':
+        final_owner = CURRENT_AI_ID
+    elif owner_override is None:
+        final_owner = None  # Explicitly claimable
+    else:
+        final_owner = owner_override
+
+    stored_content, compressed_payload = teambook_storage._prepare_content_for_storage(content, representation_policy)
+    stored_summary = summary
+    if summary and teambook_storage.COMPRESSION_AVAILABLE and teambook_storage._should_compress(representation_policy):
+        stored_summary = teambook_storage.compress_content(summary)
+
+    normalized_metadata = json.dumps(metadata_payload) if isinstance(metadata_payload, (dict, list)) else metadata_payload
+
+    # The tamper hash stays synchronous: a row must never be visible without it
+
+    tamper_hash = teambook_storage.compute_note_tamper_hash({
+        'content': content,
+        'summary': summary,
+        'tags': tags,
+        'pinned': False,
+        'owner': final_owner,
+        'teambook_name': CURRENT_TEAMBOOK,
+        'linked_items': linked_items_json,
+        'representation_policy': representation_policy,
+        'metadata': normalized_metadata,
+        'type': note['note_type'],
+        'parent_id': note['parent_id'],
+    })
+
+    return [
+        stored_content,
+        compressed_payload,
+        stored_summary,
+        tags,
+        False,
+        CURRENT_AI_ID,
+        final_owner,
+        CURRENT_TEAMBOOK,
+        note['note_type'],
+        note['parent_id'],
+        created,
+        None,
+        linked_items_json,
+        representation_policy,
+        0.0,
+        bool(collection),
+        normalized_metadata,
+        tamper_hash
+    ]
+
+def _link_written_note(conn, note_id: int, content: str, created: datetime):
+    """Attach a freshly inserted note to its session and build its edges"""
+    session_id = _detect_or_create_session(note_id, created, conn)
+    if session_id:
+        conn.execute('UPDATE notes SET session_id = ? WHERE id = ?', [session_id, note_id])
+
+    _create_all_edges(note_id, content, session_id, conn)
+
+def _add_written_note_vector(note_id: int, note: Dict, teambook: Optional[str]):
+    """Embed a note into its own teambook's vector store, deferring while another teambook is open"""
+    # The open collection only changes under _vectors_lock (_ensure_vectors), so
+    # holding it keeps the check and the add on the same teambook's store
+    with _vectors_lock:
+        if _vectors_ready_for != teambook and _ts.CURRENT_TEAMBOOK == teambook:
+            _ensure_vectors()
+        if _vectors_ready_for == teambook:
+            _add_to_vector_store(note_id, note['content'], note['summary'], note['tags'])
+            return
+        _deferred_vector_adds.setdefault(teambook, []).append((note_id, note))
+
+    logging.info(f"Deferred vector add for {note_id} until teambook {teambook or 'private'} is reopened")
+
+def _publish_written_note(note_id: int, note: Dict, teambook: Optional[str]):
+    """Post-write fan-out: vector store, Redis event, write-through cache"""
+    content = note['content']
+    summary = note['summary']
+
+    _add_written_note_vector(note_id, note, teambook)
+
+    # Publish event to Redis (real-time notifications!)
+    if PUBSUB_AVAILABLE:
+        try:
+            publish_note_created(note_id, content, summary)
+            logging.debug(f"Published note_created event for {note_id}")
+        except Exception as e:
+            logging.debug(f"Failed to publish event: {e}")
+
+    # Save to write-through cache (Linear Memory Bridge)
+    if CACHE_AVAILABLE:
+        try:
+            _save_note_to_cache(note_id, content, summary, teambook)
+            logging.debug(f"Cached note {note_id} for Linear Memory Bridge")
+        except Exception as e:
+            logging.debug(f"Failed to cache note: {e}")
+
+# Post-write fan-out runs on one background worker so write() returns after the INSERT
+POST_WRITE_DRAIN_SECONDS = 10.0
+_post_write_queue = queue.Queue()
+_post_write_worker = None
+_post_write_lock = threading.Lock()
+
+def _post_write_loop():
+    while True:
+        note_id, note, teambook, vector_only = _post_write_queue.get()
+        try:
+            if vector_only:
+                _add_written_note_vector(note_id, note, teambook)
+            else:
+                _publish_written_note(note_id, note, teambook)
+        except Exception as e:
+            logging.debug(f"Post-write work failed for {note_id}: {e}")
+        finally:
+            _post_write_queue.task_done()
+
+def _drain_post_write(timeout: float = POST_WRITE_DRAIN_SECONDS):
+    """Give queued post-write work a bounded chance to finish (registered atexit)"""
+    deadline = time.monotonic() + timeout
+    while _post_write_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+def _enqueue_post_write(note_id: int, note: Dict, vector_only: bool = False):
+    """Hand a committed note to the post-write worker, starting it on first use"""
+    global _post_write_worker
+    if _post_write_worker is None:
+        with _post_write_lock:
+            if _post_write_worker is None:
+                worker = threading.Thread(target=_post_write_loop, name="teambook-post-write", daemon=True)
+                worker.start()
+                atexit.register(_drain_post_write)
+                _post_write_worker = worker
+
+    _post_write_queue.put((note_id, note, _ts.CURRENT_TEAMBOOK, vector_only))
+
+# Operation telemetry is written by its own worker so tools don't wait on the INSERT.
+# Bounded: if the worker falls behind, further entries are dropped, not queued.
+# The worker flushes every OP_LOG_FLUSH_SECONDS or OP_LOG_BATCH_MAX entries.
+OP_LOG_QUEUE_MAX = 10000
+OP_LOG_BATCH_MAX = 128
+OP_LOG_FLUSH_SECONDS = 0.1
+_op_log_queue = queue.Queue(maxsize=OP_LOG_QUEUE_MAX)
+_op_log_worker = None
+_op_log_lock = threading.Lock()
+
+def _flush_op_log(batch: List[tuple]):
+    """Write queued (teambook, operation, ts, dur_ms, author) entries, one executemany per teambook"""
+    by_teambook: Dict[Optional[str], List[tuple]] = {}
+    for teambook, *row in batch:
+        by_teambook.setdefault(teambook, []).append(row)
+
+    for teambook, rows in by_teambook.items():
+        try:
+            with _teambook_conn(teambook) as conn:
+                first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM stats").fetchone()[0]
+                conn.execute("BEGIN TRANSACTION")
+                try:
+                    conn.executemany(
+                        'INSERT INTO stats (id, operation, ts, dur_ms, author) VALUES (?, ?, ?, ?, ?)',
+                        [[first_id + i, *row] for i, row in enumerate(rows)]
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            logging.debug(f"Operation log flush failed for {teambook or 'private'} ({len(rows)} entries): {e}")
+
+def _op_log_loop():
+    while True:
+        batch = [_op_log_queue.get()]
+        deadline = time.monotonic() + OP_LOG_FLUSH_SECONDS
+        while len(batch) < OP_LOG_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_op_log_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            _flush_op_log(batch)
+        finally:
+            for _ in batch:
+                _op_log_queue.task_done()
+
+def _drain_op_log(timeout: float = POST_WRITE_DRAIN_SECONDS):
+    """Give queued operation log entries a bounded chance to land (registered atexit)"""
+    deadline = time.monotonic() + timeout
+    while _op_log_queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+def _log_operation(operation: str, dur_ms: int = None):
+    """Queue an operation log entry for the current teambook"""
+    global _op_log_worker
+    if _op_log_worker is None:
+        with _op_log_lock:
+            if _op_log_worker is None:
+                worker = threading.Thread(target=_op_log_loop, name="teambook-op-log", daemon=True)
+                worker.start()
+                atexit.register(_drain_op_log)
+                _op_log_worker = worker
+
+    try:
+        _op_log_queue.put_nowait((
+            _ts.CURRENT_TEAMBOOK, operation, datetime.now(timezone.utc), dur_ms, CURRENT_AI_ID
+        ))
+    except queue.Full:
+        logging.debug(f"Operation log queue full, dropped {operation}")
+
+def _write_result(note_id: int, note: Dict, created: datetime) -> str:
+    """Pure pipe format (token optimized!)"""
+    result_str = f"{note_id}|{format_time_compact(created)}|{pipe_escape(note['summary'])}"
+    if note['truncated']:
+        result_str += f"|T{note['orig_len']}"
+    return result_str
+
+def write(content: str = None, summary: str = None, tags: List[str] = None,
+          linked_items: List[str] = None, **kwargs) -> Dict:
+    """Write content to teambook"""
+    try:
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        note = _prepare_note(content, summary, tags, linked_items, kwargs, now)
 
         # Use storage adapter if available, otherwise fall back to DuckDB
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
 
         if adapter:
             # Use storage adapter (PostgreSQL/Redis/DuckDB)
-            note_id = adapter.write_note(
-                content=content,
-                summary=summary,
-                tags=tags,
-                pinned=False,
-                linked_items=json.dumps(linked_items) if linked_items else None,
-                owner=None,  # Will use CURRENT_AI_ID in backend
-                note_type=note_type,
-                parent_id=parent_id,
-                representation_policy=representation_policy,
-                metadata=metadata_payload
-            )
+            note_id = _write_note_via_adapter(adapter, note)
         else:
             # Fallback to direct DuckDB
             with _get_db_conn() as conn:
-                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
-                note_id = max_id + 1
-
-                # Determine owner (None for claimable tasks, CURRENT_AI_ID otherwise)
-                if owner_override == 'default':
-                    final_owner = CURRENT_AI_ID
-                elif owner_override is None:
-                    final_owner = None  # Explicitly claimable
-                else:
-                    final_owner = owner_override
-
-                stored_content, compressed_payload = teambook_storage._prepare_content_for_storage(content, representation_policy)
-                stored_summary = summary
-                if summary and teambook_storage.COMPRESSION_AVAILABLE and teambook_storage._should_compress(representation_policy):
-                    stored_summary = teambook_storage.compress_content(summary)
-
-                normalized_metadata = json.dumps(metadata_payload) if isinstance(metadata_payload, (dict, list)) else metadata_payload
-
-                tamper_hash = teambook_storage.compute_note_tamper_hash({
-                    'content': content,
-                    'summary': summary,
-                    'tags': tags,
-                    'pinned': False,
-                    'owner': final_owner,
-                    'teambook_name': CURRENT_TEAMBOOK,
-                    'linked_items': json.dumps(linked_items) if linked_items else None,
-                    'representation_policy': representation_policy,
-                    'metadata': normalized_metadata,
-                    'type': note_type,
-                    'parent_id': parent_id,
-                })
+                note_id = _insert_with_new_id(
+                    conn, 'notes', _NOTE_INSERT_COLUMNS,
+                    _note_row_values(note, now)
+                )
 
-                conn.execute('''
-                    INSERT INTO notes (
-                        id, content, content_compressed, summary, tags, pinned, author, owner,
-                        teambook_name, type, parent_id, created, session_id, linked_items,
-                        representation_policy, pagerank, has_vector, metadata, tamper_hash
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', [
-                    note_id,
-                    stored_content,
-                    compressed_payload,
-                    stored_summary,
-                    tags,
-                    False,
-                    CURRENT_AI_ID,
-                    final_owner,
-                    CURRENT_TEAMBOOK,
-                    note_type,
-                    parent_id,
-                    datetime.now(timezone.utc),
-                    None,
-                    json.dumps(linked_items) if linked_items else None,
-                    representation_policy,
-                    0.0,
-                    bool(collection),
-                    normalized_metadata,
-                    tamper_hash
-                ])
+                _link_written_note(conn, note_id, note['content'], now)
+
+                # Mark PageRank as dirty
+                _ts.PAGERANK_DIRTY = True
+
+        _enqueue_post_write(note_id, note)
 
-                session_id = _detect_or_create_session(note_id, datetime.now(timezone.utc), conn)
-                if session_id:
-                    conn.execute('UPDATE notes SET session_id = ? WHERE id = ?', [session_id, note_id])
+        save_last_operation('write', {'id': note_id, 'summary': note['summary']})
+        _invalidate_note_id_cache()
+        _mark_fts_stale()
+        _log_operation('write', int((time.perf_counter() - start) * 1000))
 
-                _create_all_edges(note_id, content, session_id, conn)
+        return _write_result(note_id, note, now)
+
+    except Exception as e:
+        logging.error(f"Error in write: {e}", exc_info=True)
+        return f"!write_failed:{str(e)[:50]}"
+
+def write_many(items: List[Dict] = None, **kwargs) -> Dict:
+    """
+    Write several notes in one call.
+
+    Each item takes write()'s arguments. On the direct DuckDB path all rows
+    go in with one multi-row INSERT, so either every note is written or
+    none is. Adapter backends write them one by one; if one fails, the
+    notes already written are returned followed by a !write_failed:partial line.
+    """
+    try:
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        items = kwargs.get('items', items) or []
+        if not items:
+            return "!write_failed:no_items"
+        if len(items) > _ts.BATCH_MAX:
+            return f"!write_failed:max_exceeded:{_ts.BATCH_MAX}"
+
+        notes = [
+            _prepare_note(None, item.get('summary'), item.get('tags'), item.get('linked_items'), item, now)
+            for item in items
+        ]
+
+        adapter = _current_adapter()
+        failure = None
+
+        if adapter:
+            note_ids = []
+            for note in notes:
+                try:
+                    note_ids.append(_write_note_via_adapter(adapter, note))
+                except Exception as e:
+                    if not note_ids:
+                        raise
+                    logging.error(f"write_many stopped after {len(note_ids)}/{len(notes)} notes: {e}")
+                    failure = e
+                    break
+            notes = notes[:len(note_ids)]
+        else:
+            with _get_db_conn() as conn:
+                # A single statement: atomic without an explicit transaction
+                note_ids = _insert_rows_with_new_ids(
+                    conn, 'notes', _NOTE_INSERT_COLUMNS,
+                    [_note_row_values(note, now) for note in notes]
+                )
+
+                # Session/edge linking runs after the rows are committed, as in write()
+                for note_id, note in zip(note_ids, notes):
+                    try:
+                        _link_written_note(conn, note_id, note['content'], now)
+                    except Exception as e:
+                        logging.warning(f"Linking note {note_id} failed: {e}")
 
                 # Mark PageRank as dirty
-                import teambook_shared
-                teambook_shared.PAGERANK_DIRTY = True
-        
-        # Add to vector store
-        _add_to_vector_store(note_id, content, summary, tags)
-        
-        # Publish event to Redis (real-time notifications!)
-        if PUBSUB_AVAILABLE:
-            try:
-                publish_note_created(note_id, content, summary)
-                logging.debug(f"Published note_created event for {note_id}")
-            except Exception as e:
-                logging.debug(f"Failed to publish event: {e}")
+                _ts.PAGERANK_DIRTY = True
 
-        # Save to write-through cache (Linear Memory Bridge)
-        if CACHE_AVAILABLE:
-            try:
-                _save_note_to_cache(note_id, content, summary, CURRENT_TEAMBOOK)
-                logging.debug(f"Cached note {note_id} for Linear Memory Bridge")
-            except Exception as e:
-                logging.debug(f"Failed to cache note: {e}")
+        for note_id, note in zip(note_ids, notes):
+            _enqueue_post_write(note_id, note)
 
-        save_last_operation('write', {'id': note_id, 'summary': summary})
-        _log_operation_to_db('write', int((datetime.now(timezone.utc) - start).total_seconds() * 1000))
+        save_last_operation('write', {'id': note_ids[-1], 'summary': notes[-1]['summary']})
+        _invalidate_note_id_cache()
+        _mark_fts_stale()
+        _log_operation('write', int((time.perf_counter() - start) * 1000))
 
-        # Pure pipe format (token optimized!)
-        result_str = f"{note_id}|{format_time_compact(datetime.now(timezone.utc))}|{pipe_escape(summary)}"
-        if truncated:
-            result_str += f"|T{orig_len}"
-        return result_str
+        lines = [_write_result(note_id, note, now) for note_id, note in zip(note_ids, notes)]
+        if failure is not None:
+            lines.append(f"!write_failed:partial:{len(note_ids)}/{len(items)}:{str(failure)[:50]}")
+        return '\n'.join(lines)
 
     except Exception as e:
-        logging.error(f"Error in write: {e}", exc_info=True)
+        logging.error(f"Error in write_many: {e}", exc_info=True)
         return f"!write_failed:{str(e)[:50]}"
 
+# Vector search runs here during hybrid reads; keyword search stays on the
+# caller's thread since it uses the caller's DuckDB connection
+_search_pool = None
+_search_pool_lock = threading.Lock()
+
+def _search_executor() -> ThreadPoolExecutor:
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="teambook-search")
+    return _search_pool
+
+# Full-text index repair: at most one background rebuild per cooldown window
+FTS_REPAIR_COOLDOWN_SECONDS = 300
+_fts_repair_attempted_at = None
+_fts_repair_lock = threading.Lock()
+
+# create_fts_index is a snapshot: notes written after it are invisible to
+# match_bm25. Writes mark it stale (read() schedules a rebuild) and, until
+# then, read() covers ids past the highest indexed one with an ILIKE scan.
+_fts_stale = False
+_fts_indexed_max_ids: Dict[Optional[str], int] = {}
+
+def _mark_fts_stale():
+    global _fts_stale
+    _fts_stale = True
+
+def _fts_indexed_max_id(conn) -> int:
+    """Highest note id in the current teambook's FTS snapshot (cached until rebuilt)"""
+    teambook = _ts.CURRENT_TEAMBOOK
+    max_id = _fts_indexed_max_ids.get(teambook)
+    if max_id is None:
+        max_id = conn.execute("SELECT COALESCE(MAX(name), 0) FROM fts_main_notes.docs").fetchone()[0]
+        _fts_indexed_max_ids[teambook] = max_id
+    return max_id
+
+def _fts_search(conn, query: str, limit: int) -> List[int]:
+    """Keyword search through the FTS index, best BM25 score first"""
+    return [row[0] for row in conn.execute('''
+        SELECT id FROM (
+            SELECT id, fts_main_notes.match_bm25(id, ?) AS score
+            FROM notes
+        ) sq
+        WHERE score IS NOT NULL
+        ORDER BY score DESC
+        LIMIT ?
+    ''', [query, limit]).fetchall()]
+
+def _schedule_fts_repair():
+    """
+    Rebuild the FTS index on a background thread, at most once per
+    FTS_REPAIR_COOLDOWN_SECONDS.
+
+    Used both after a failed query and to refresh a stale snapshot. FTS is
+    only (re-)enabled once a probe query against the rebuilt index
+    succeeds; read() keeps using ILIKE scans until then.
+    """
+    global _fts_repair_attempted_at, _fts_stale
+    with _fts_repair_lock:
+        now = time.monotonic()
+        if _fts_repair_attempted_at is not None and now - _fts_repair_attempted_at < FTS_REPAIR_COOLDOWN_SECONDS:
+            return
+        _fts_repair_attempted_at = now
+        # Writes landing during the rebuild mark it stale again
+        _fts_stale = False
+    teambook = _ts.CURRENT_TEAMBOOK
+
+    def _repair():
+        try:
+            with _teambook_conn(teambook) as conn:
+                conn.execute("LOAD fts")
+                conn.execute("PRAGMA create_fts_index('notes', 'id', 'content', 'summary', overwrite=1)")
+                _fts_search(conn, "probe", 1)
+            _fts_indexed_max_ids.pop(teambook, None)
+            teambook_storage.FTS_ENABLED = True
+            logging.info("FTS index rebuilt")
+        except Exception as e:
+            logging.debug(f"FTS repair failed: {e}")
+
+    threading.Thread(target=_repair, name="fts-repair", daemon=True).start()
+
+def _fetch_search_results(conn, semantic_ids: List[int], keyword_ids: List[int],
+                          like_query: Optional[str], limit: int,
+                          conditions: List[str], params: List[Any],
+                          like_min_id: Optional[int] = None) -> List[tuple]:
+    """
+    Merge search hits and fetch the matching notes in one statement.
+
+    Hits are interleaved semantic/keyword by position (first occurrence wins),
+    cut to `limit`, then filtered by `conditions`; the top-ranked hit leads and
+    the rest sort pinned/pagerank/recency. With `like_query` the ILIKE keyword
+    scan runs as a CTE here rather than as a separate round-trip; `like_min_id`
+    limits it to notes with a higher id (those missing from the FTS snapshot).
+    """
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    hit_sources = [
+        "SELECT id, pos, 0 AS src FROM sem",
+        "SELECT id, pos, 1 AS src FROM kw",
+    ]
+    like_cte = ""
+    like_params = []
+    if like_query is not None:
+        like_cte = '''
+            like_kw AS (
+                SELECT id, row_number() OVER (ORDER BY pagerank DESC, created DESC) AS pos
+                FROM (
+                    SELECT id, pagerank, created FROM notes
+                    WHERE (content ILIKE ? OR summary ILIKE ?) AND type IS NULL AND id > ?
+                    ORDER BY pagerank DESC, created DESC
+                    LIMIT ?
+                ) l
+            ),'''
+        like_params = [like_query, like_query, like_min_id or 0, limit]
+        hit_sources.append("SELECT id, pos, 1 AS src FROM like_kw")
+
+    return conn.execute(f'''
+        WITH sem AS (
+            SELECT unnest(?::BIGINT[]) AS id, generate_subscripts(?::BIGINT[], 1) AS pos
+        ),
+        kw AS (
+            SELECT unnest(?::BIGINT[]) AS id, generate_subscripts(?::BIGINT[], 1) AS pos
+        ),{like_cte}
+        merged AS (
+            SELECT id, MIN(pos * 2 + src) AS rk
+            FROM ({' UNION ALL '.join(hit_sources)}) hits
+            GROUP BY id
+        ),
+        top AS (SELECT id, rk FROM merged ORDER BY rk LIMIT ?)
+        SELECT n.id, n.content, n.summary, n.tags, n.pinned, n.author, n.owner, n.created, n.pagerank
+        FROM notes n JOIN top ON n.id = top.id
+        WHERE {where_clause} AND n.type IS NULL
+        ORDER BY
+            CASE WHEN top.rk = (SELECT MIN(rk) FROM top) THEN 0 ELSE 1 END,
+            n.pinned DESC, n.pagerank DESC, n.created DESC
+    ''', [semantic_ids, semantic_ids, keyword_ids, keyword_ids] + like_params + [limit] + params).fetchall()
+
+def _format_note_line(note: tuple, verbose: bool = False) -> str:
+    """One pipe-format read() line: id|time|summary[|[PINNED]][|@owner][|RANK:x]"""
+    note_id, content, summary, _tags, pinned, _author, owner, created, pagerank = note
+    line = f"{note_id}|{pipe_escape(_format_time_cached(created))}|{pipe_escape(summary or simple_summary(content, 150))}"
+    if pinned:
+        line += '|[PINNED]'
+    if owner:
+        line += '|' + pipe_escape(f"@{owner}")
+    if verbose and pagerank and pagerank > 0.01:
+        line += f"|RANK:{pagerank:.2f}"
+    return line
+
 def read(query: str = None, tag: str = None, when: str = None,
          owner: str = None, pinned_only: bool = False, show_all: bool = False,
          limit: int = 50, mode: str = "hybrid", verbose: bool = False, **kwargs) -> Dict:
     """Read content from teambook"""
     try:
-        start_time = datetime.now(timezone.utc)
+        start_time = time.perf_counter()
         
         if isinstance(limit, str):
             try:
@@ -1270,7 +1944,7 @@ def read(query: str = None, tag: str = None, when: str = None,
             owner = "none"
 
         # Try storage adapter for simple reads (no advanced features)
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         use_advanced_features = mode in ["semantic", "hybrid"] or when  # Time queries and vector search need DuckDB
 
         if adapter and not use_advanced_features:
@@ -1309,28 +1983,12 @@ def read(query: str = None, tag: str = None, when: str = None,
 
                 # Format and return results
                 save_last_operation('read', {"notes": all_notes})
-                _log_operation_to_db('read', int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000))
+                _log_operation('read', int((time.perf_counter() - start_time) * 1000))
 
                 if not all_notes:
                     return ""
 
-                lines = []
-                for note in all_notes:
-                    note_id, content, summary, tags_arr, pinned, author, owner_val, created, pagerank = note
-                    parts = [
-                        str(note_id),
-                        format_time_compact(created),
-                        summary or simple_summary(content, 150)
-                    ]
-                    if pinned:
-                        parts.append('[PINNED]')
-                    if owner_val:
-                        parts.append(f"@{owner_val}")
-                    if verbose and pagerank and pagerank > 0.01:
-                        parts.append(f"RANK:{pagerank:.2f}")
-                    lines.append('|'.join(pipe_escape(p) for p in parts))
-
-                return '\n'.join(lines)
+                return '\n'.join(_format_note_line(note, verbose) for note in all_notes)
 
             except Exception as e:
                 logging.warning(f"Storage adapter read failed, falling back to DuckDB: {e}")
@@ -1365,76 +2023,51 @@ def read(query: str = None, tag: str = None, when: str = None,
             
             notes = []
             
-            # Get pinned notes
-            if not pinned_only and not query and not tag and not when and not owner:
-                pinned_notes = conn.execute('''
-                    SELECT id, content, summary, tags, pinned, author, owner, created, pagerank
-                    FROM notes WHERE pinned = TRUE AND type IS NULL
-                    ORDER BY created DESC
-                ''').fetchall()
-            else:
-                pinned_notes = []
-            
             if query:
-                # Semantic search
-                semantic_ids = _search_vectors(str(query).strip(), limit) if mode in ["semantic", "hybrid"] else []
+                # Semantic search (hybrid: overlaps with the keyword search below)
+                semantic_ids = []
+                semantic_future = None
+                if mode in ["semantic", "hybrid"]:
+                    _ensure_vectors()
+                    if mode == "hybrid":
+                        semantic_future = _search_executor().submit(_search_vectors, str(query).strip(), limit)
+                    else:
+                        semantic_ids = _search_vectors(str(query).strip(), limit)
                 
                 # Keyword search
                 keyword_ids = []
+                like_query = None
+                like_min_id = None
                 if mode in ["keyword", "hybrid"]:
                     if teambook_storage.FTS_ENABLED:
                         try:
-                            fts_results = conn.execute('''
-                                SELECT DISTINCT n.id
-                                FROM fts_main_notes f
-                                JOIN notes n ON f.id = n.id
-                                WHERE f MATCH ?
-                                ORDER BY n.pagerank DESC, n.created DESC
-                                LIMIT ?
-                            ''', [str(query).strip(), limit]).fetchall()
-                            keyword_ids = [row[0] for row in fts_results]
+                            keyword_ids = _fts_search(conn, str(query).strip(), limit)
+                            like_min_id = _fts_indexed_max_id(conn)
                         except Exception as e:
                             teambook_storage.FTS_ENABLED = False
+                            keyword_ids = []
                             logging.debug(f'FTS failed, using LIKE: {e}')
-                            pass
+                    if not teambook_storage.FTS_ENABLED or _fts_stale:
+                        _schedule_fts_repair()
                     
+                    # The ILIKE scan runs inside the fused query below: over every
+                    # note when FTS found nothing, else only notes newer than the index
+                    like_query = f"%{str(query).strip()}%"
                     if not keyword_ids:
-                        like_query = f"%{str(query).strip()}%"
-                        like_results = conn.execute('''
-                            SELECT id FROM notes 
-                            WHERE (content ILIKE ? OR summary ILIKE ?) AND type IS NULL
-                            ORDER BY pagerank DESC, created DESC
-                            LIMIT ?
-                        ''', [like_query, like_query, limit]).fetchall()
-                        keyword_ids = [row[0] for row in like_results]
+                        like_min_id = None
                 
-                # Combine results
-                all_ids, seen = [], set()
-                for i in range(max(len(semantic_ids), len(keyword_ids))):
-                    if i < len(semantic_ids) and semantic_ids[i] not in seen:
-                        all_ids.append(semantic_ids[i])
-                        seen.add(semantic_ids[i])
-                    if i < len(keyword_ids) and keyword_ids[i] not in seen:
-                        all_ids.append(keyword_ids[i])
-                        seen.add(keyword_ids[i])
+                if semantic_future is not None:
+                    try:
+                        semantic_ids = semantic_future.result()
+                    except Exception as e:
+                        logging.debug(f"Vector search failed: {e}")
                 
-                if all_ids:
-                    note_ids = all_ids[:limit]
-                    placeholders = ','.join(['?'] * len(note_ids))
-                    
-                    where_clause = " AND ".join(conditions) if conditions else "1=1"
-                    final_params = note_ids + params + ([note_ids[0]] if note_ids else [])
-                    
-                    notes = conn.execute(f'''
-                        SELECT id, content, summary, tags, pinned, author, owner, created, pagerank
-                        FROM notes
-                        WHERE id IN ({placeholders}) AND {where_clause} AND type IS NULL
-                        ORDER BY 
-                            CASE WHEN id = ? THEN 0 ELSE 1 END,
-                            pinned DESC, pagerank DESC, created DESC
-                    ''', final_params).fetchall()
+                notes = _fetch_search_results(
+                    conn, semantic_ids, keyword_ids, like_query, limit, conditions, params,
+                    like_min_id
+                )
             else:
-                # Regular query without search
+                # Regular query without search (pinned notes sort first)
                 where_clause = " WHERE " + " AND ".join(conditions) if conditions else ""
                 if where_clause:
                     where_clause += " AND type IS NULL"
@@ -1448,11 +2081,10 @@ def read(query: str = None, tag: str = None, when: str = None,
                     LIMIT ?
                 ''', params + [limit]).fetchall()
         
-        # Combine results
-        all_notes = list(pinned_notes) + [n for n in notes if not n[4]]
+        all_notes = notes
         
         save_last_operation('read', {"notes": all_notes})
-        _log_operation_to_db('read', int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000))
+        _log_operation('read', int((time.perf_counter() - start_time) * 1000))
 
         # Check for pending notifications (Phase 2 feature)
         notifications = None
@@ -1468,23 +2100,7 @@ def read(query: str = None, tag: str = None, when: str = None,
                 return f"!no_notes|notify:{notifications['unseen']}:{notifications['summary'][:30]}"
             return ""  # Empty = nothing found
 
-        lines = []
-        for note in all_notes:
-            note_id, content, summary, tags_arr, pinned, author, owner, created, pagerank = note
-            parts = [
-                str(note_id),
-                format_time_compact(created),
-                summary or simple_summary(content, 150)
-            ]
-            if pinned:
-                parts.append('[PINNED]')
-            if owner:
-                parts.append(f"@{owner}")
-            if verbose and pagerank and pagerank > 0.01:
-                parts.append(f"RANK:{pagerank:.2f}")
-            lines.append('|'.join(pipe_escape(p) for p in parts))
-
-        result = '\n'.join(lines)
+        result = '\n'.join(_format_note_line(note, verbose) for note in all_notes)
         # Add notifications if present
         if notifications:
             result = f"NOTIFY:{notifications['unseen']}:{notifications['summary'][:30]}\n{result}"
@@ -1520,7 +2136,7 @@ def teambook_connection(verbose: bool = False, **kwargs) -> Dict:
             pass
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         stats = None
 
         if adapter:
@@ -1552,24 +2168,29 @@ def teambook_connection(verbose: bool = False, **kwargs) -> Dict:
         # Fallback to DuckDB if adapter failed
         if not stats:
             with _get_db_conn() as conn:
-                notes = conn.execute('SELECT COUNT(*) FROM notes WHERE type IS NULL').fetchone()[0]
-                pinned = conn.execute('SELECT COUNT(*) FROM notes WHERE pinned = TRUE AND type IS NULL').fetchone()[0]
-                owned = conn.execute('SELECT COUNT(*) FROM notes WHERE owner IS NOT NULL AND type IS NULL').fetchone()[0]
-                unclaimed = conn.execute('SELECT COUNT(*) FROM notes WHERE owner IS NULL AND type IS NULL').fetchone()[0]
-
-                recent = conn.execute('SELECT created FROM notes WHERE type IS NULL ORDER BY created DESC LIMIT 1').fetchone()
-                last_activity = format_time_compact(recent[0]) if recent else "never"
+                # Note/ownership counts and last activity in a single pass over notes
+                notes, pinned, owned, unclaimed, last_created = conn.execute('''
+                    SELECT
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE pinned = TRUE),
+                        COUNT(*) FILTER (WHERE owner IS NOT NULL),
+                        COUNT(*) FILTER (WHERE owner IS NULL),
+                        MAX(created)
+                    FROM notes
+                    WHERE type IS NULL
+                ''').fetchone()
+                last_activity = format_time_compact(last_created) if last_created else "never"
 
         # Verbose mode still requires DuckDB for some advanced stats (edges, entities, etc.)
         if verbose:
             with _get_db_conn() as conn:
-                edges = conn.execute('SELECT COUNT(*) FROM edges').fetchone()[0]
-                entities = conn.execute('SELECT COUNT(*) FROM entities').fetchone()[0]
-                sessions = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
-                vault = conn.execute('SELECT COUNT(*) FROM vault').fetchone()[0]
-                tags = conn.execute('SELECT COUNT(DISTINCT tag) FROM (SELECT unnest(tags) as tag FROM notes WHERE tags IS NOT NULL)').fetchone()[0]
-                vector_count = collection.count() if collection else 0
-                evolutions = conn.execute("SELECT COUNT(*) FROM notes WHERE type = 'evolution'").fetchone()[0]
+                # Only the counts that are actually reported, in one round-trip
+                edges, evolutions = conn.execute('''
+                    SELECT
+                        (SELECT COUNT(*) FROM edges),
+                        (SELECT COUNT(*) FROM notes WHERE type = 'evolution')
+                ''').fetchone()
+            vector_count = collection.count() if collection else 0
 
             # Pure pipe format (token optimized!)
             parts = [
@@ -1642,22 +2263,17 @@ def _modify_pin_status(id_param: Any, pin: bool) -> Dict:
             return "!pin_failed:invalid_id"
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         result = None
 
         if adapter:
             try:
-                # Get note first to check if it exists and get summary
-                note_data = adapter.get_note(note_id)
-                if note_data:
-                    # Update the note
-                    success = adapter.update_note(note_id, pinned=pin)
-                    if success:
-                        result = (note_data.get('summary'), note_data.get('content'))
-                    else:
-                        return f"!note_failed:update_failed:{note_id}"
-                else:
+                outcome, note_data = adapter.update_note_returning(note_id, pinned=pin)
+                if outcome == 'not_found':
                     return f"!note_failed:not_found:{note_id}"
+                if outcome == 'update_failed':
+                    return f"!note_failed:update_failed:{note_id}"
+                result = (note_data.get('summary'), note_data.get('content'))
             except Exception as e:
                 logging.warning(f"Storage adapter pin/unpin failed, falling back to DuckDB: {e}")
 
@@ -1665,7 +2281,7 @@ def _modify_pin_status(id_param: Any, pin: bool) -> Dict:
         if not result:
             with _get_db_conn() as conn:
                 result = conn.execute(
-                    'UPDATE notes SET pinned = ? WHERE id = ? RETURNING summary, content',
+                    "UPDATE notes SET pinned = ? WHERE id = ? RETURNING summary, content",
                     [pin, note_id]
                 ).fetchone()
 
@@ -1677,10 +2293,7 @@ def _modify_pin_status(id_param: Any, pin: bool) -> Dict:
 
         if pin:
             summ = result[0] or simple_summary(result[1], 100)
-            if OUTPUT_FORMAT == 'pipe':
-                return f"pinned:{note_id}|{summ}"
-            else:
-                return f"pinned:{note_id}|{summ}"
+            return f"pinned:{note_id}|{summ}"
         else:
             return f"unpinned:{note_id}"
 
@@ -1697,34 +2310,24 @@ def get_full_note(id: Any = None, verbose: bool = False, **kwargs) -> Dict:
             return "!error:invalid_note_id"
         
         with _get_db_conn() as conn:
-            note = conn.execute('SELECT * FROM notes WHERE id = ?', [note_id]).fetchone()
+            note = conn.execute(_FULL_NOTE_SQL, [note_id]).fetchone()
             if not note:
                 return f"!error:note_not_found:{note_id}"
-            
-            cols = [desc[0] for desc in conn.description]
-            result = dict(zip(cols, note))
-            
-            # Clean up datetime
-            if 'created' in result and result['created']:
-                result['created'] = format_time_compact(result['created'])
-            
-            # Get entities
-            entities = conn.execute('''
-                SELECT e.name FROM entities e
-                JOIN entity_notes en ON e.id = en.entity_id
-                WHERE en.note_id = ?
-            ''', [note_id]).fetchall()
-            if entities:
-                result['entities'] = [e[0] for e in entities]
-            
-            # Remove backend fields
-            for field in ['session_id', 'linked_items', 'pagerank', 'has_vector', 'parent_id']:
-                result.pop(field, None)
+
+        result = dict(zip(_NOTE_USER_COLS, note))
+
+        # Clean up datetime
+        if result['created']:
+            result['created'] = format_time_compact(result['created'])
+
+        # Entities come back aggregated on the same row (NULL when none)
+        entities = note[len(_NOTE_USER_COLS)]
+        if entities:
+            result['entities'] = entities
         
         save_last_operation('get_full_note', {'id': note_id})
         # Convert dict to pipe format
-        parts = [f"{k}:{v}" for k, v in result.items() if k not in ["type", "teambook_name"]]
-        return '|'.join(str(p) for p in parts)
+        return '|'.join(f"{k}:{v}" for k, v in result.items())
 
     except Exception as e:
         logging.error(f"Error in get_full_note: {e}", exc_info=True)
@@ -1732,6 +2335,39 @@ def get_full_note(id: Any = None, verbose: bool = False, **kwargs) -> Dict:
 
 # ============= VAULT FUNCTIONS =============
 
+# Decrypted secrets keyed by (teambook, key) -> (ciphertext, plaintext).
+# Fernet tokens differ on every encrypt, so an unchanged ciphertext means the
+# cached plaintext is still valid and the decrypt can be skipped.
+VAULT_CACHE_MAX = 512
+VAULT_CACHE_MAX_VALUE = 64 * 1024  # Don't hold large secrets in memory
+_vault_cache: 'OrderedDict[Tuple[Optional[str], str], Tuple[bytes, str]]' = OrderedDict()
+_vault_cache_lock = threading.Lock()
+
+def _vault_cache_put(key: str, encrypted: bytes, value: str):
+    """Remember a secret's plaintext against its current ciphertext"""
+    cache_key = (CURRENT_TEAMBOOK, key)
+    with _vault_cache_lock:
+        if len(encrypted) > VAULT_CACHE_MAX_VALUE:
+            _vault_cache.pop(cache_key, None)
+            return
+        _vault_cache[cache_key] = (encrypted, value)
+        _vault_cache.move_to_end(cache_key)
+        while len(_vault_cache) > VAULT_CACHE_MAX:
+            _vault_cache.popitem(last=False)
+
+def _vault_decrypt(key: str, encrypted: bytes) -> str:
+    """Decrypt a vault value, reusing the cached plaintext if unchanged"""
+    cache_key = (CURRENT_TEAMBOOK, key)
+    with _vault_cache_lock:
+        cached = _vault_cache.get(cache_key)
+        if cached is not None and cached[0] == encrypted:
+            _vault_cache.move_to_end(cache_key)
+            return cached[1]
+
+    decrypted = teambook_storage.vault_manager.decrypt(encrypted)
+    _vault_cache_put(key, encrypted, decrypted)
+    return decrypted
+
 def vault_store(key: str = None, value: str = None, **kwargs) -> Dict:
     """Store encrypted secret"""
     try:
@@ -1747,17 +2383,17 @@ def vault_store(key: str = None, value: str = None, **kwargs) -> Dict:
             return f"!vault_store_failed:too_large:{value_size}"
         
         # Ensure vault_manager is initialized
-        if not teambook_storage.vault_manager:
-            _init_vault_manager()
+        _ensure_vault()
 
         encrypted = teambook_storage.vault_manager.encrypt(value)
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         if adapter:
             try:
                 adapter.vault_set(key, encrypted, CURRENT_AI_ID)
-                _log_operation_to_db('vault_store')
+                _vault_cache_put(key, encrypted, value)
+                _log_operation('vault_store')
                 return f"stored:{key}"
             except Exception as e:
                 logging.warning(f"Storage adapter vault_set failed, falling back to DuckDB: {e}")
@@ -1773,7 +2409,8 @@ def vault_store(key: str = None, value: str = None, **kwargs) -> Dict:
                     updated = EXCLUDED.updated
             ''', [key, encrypted, now, now, CURRENT_AI_ID])
 
-        _log_operation_to_db('vault_store')
+        _vault_cache_put(key, encrypted, value)
+        _log_operation('vault_store')
         return f"stored:{key}"
     
     except Exception as e:
@@ -1788,11 +2425,10 @@ def vault_retrieve(key: str = None, **kwargs) -> Dict:
             return "!vault_retrieve_failed:key_required"
         
         # Ensure vault_manager is initialized
-        if not teambook_storage.vault_manager:
-            _init_vault_manager()
+        _ensure_vault()
 
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         encrypted_value = None
 
         if adapter:
@@ -1805,8 +2441,7 @@ def vault_retrieve(key: str = None, **kwargs) -> Dict:
         if not encrypted_value:
             with _get_db_conn() as conn:
                 result = conn.execute(
-                    'SELECT encrypted_value FROM vault WHERE key = ?',
-                    [key]
+                    "SELECT encrypted_value FROM vault WHERE key = ?", [key]
                 ).fetchone()
 
             if not result:
@@ -1819,8 +2454,8 @@ def vault_retrieve(key: str = None, **kwargs) -> Dict:
         elif isinstance(encrypted_value, str):
             encrypted_value = encrypted_value.encode()
 
-        decrypted = teambook_storage.vault_manager.decrypt(encrypted_value)
-        _log_operation_to_db('vault_retrieve')
+        decrypted = _vault_decrypt(key, encrypted_value)
+        _log_operation('vault_retrieve')
         return f"{key}|{decrypted}"
     
     except Exception as e:
@@ -1831,7 +2466,7 @@ def vault_list(**kwargs) -> Dict:
     """List vault keys"""
     try:
         # Try storage adapter first
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         items_data = None
 
         if adapter:
@@ -1839,13 +2474,8 @@ def vault_list(**kwargs) -> Dict:
                 items_data = adapter.vault_list()
                 # Convert from list of dicts to expected format
                 if items_data:
-                    if OUTPUT_FORMAT == 'pipe':
-                        keys = []
-                        for item in items_data:
-                            keys.append(f"{item['key']}|{format_time_compact(item['updated'])}")
-                        return '\n'.join(keys)
-                    else:
-                        return '\n'.join([f"{item['key']}|{format_time_compact(item['updated'])}" for item in items_data])
+                    fmt = _format_time_cached
+                    return '\n'.join(f"{item['key']}|{fmt(item['updated'])}" for item in items_data)
                 else:
                     return ""  # Vault empty
             except Exception as e:
@@ -1854,23 +2484,14 @@ def vault_list(**kwargs) -> Dict:
         # Fallback to DuckDB
         with _get_db_conn() as conn:
             items = conn.execute(
-                'SELECT key, updated FROM vault ORDER BY updated DESC'
+                "SELECT key, updated FROM vault ORDER BY updated DESC"
             ).fetchall()
 
         if not items:
             return ""  # Vault empty
 
-        if OUTPUT_FORMAT == 'pipe':
-            keys = []
-            for key, updated in items:
-                keys.append(f"{key}|{format_time_compact(updated)}")
-            return '\n'.join(keys)
-        else:
-            keys = [
-                {'key': key, 'updated': format_time_compact(updated)}
-                for key, updated in items
-            ]
-            return '\n'.join([f"{k['key']}|{k['updated']}" for k in keys])
+        fmt = _format_time_cached
+        return '\n'.join(f"{key}|{fmt(updated)}" for key, updated in items)
     
     except Exception as e:
         logging.error(f"Error in vault_list: {e}")
@@ -1953,6 +2574,40 @@ except ImportError:
 
 # ============= OBSERVABILITY =============
 
+# Per-source activity for who_is_here; messages and locks tables are optional
+_ACTIVITY_SQL = {
+    'notes': '''
+        SELECT author as ai_id, MAX(created) as last_seen
+        FROM notes
+        WHERE created > ? AND type IS NULL
+        GROUP BY author
+    ''',
+    'messages': '''
+        SELECT from_ai as ai_id, MAX(created) as last_seen
+        FROM messages
+        WHERE created > ?
+        GROUP BY from_ai
+    ''',
+    'locks': '''
+        SELECT held_by as ai_id, MAX(acquired_at) as last_seen
+        FROM locks
+        WHERE acquired_at > ?
+        GROUP BY held_by
+    ''',
+}
+_activity_tables_seen: Dict[Optional[str], frozenset] = {}
+
+def _activity_tables(conn) -> frozenset:
+    """Optional activity tables present in the current teambook DB (found ones are remembered)"""
+    key = _ts.CURRENT_TEAMBOOK
+    found = _activity_tables_seen.get(key, frozenset())
+    if len(found) < 2:
+        rows = conn.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE table_name IN ('messages', 'locks')"
+        ).fetchall()
+        found = _activity_tables_seen[key] = frozenset(row[0] for row in rows)
+    return found
+
 def who_is_here(minutes: int = 5, **kwargs) -> Dict:
     """
     Show which AIs are currently active in the teambook.
@@ -1967,71 +2622,36 @@ def who_is_here(minutes: int = 5, **kwargs) -> Dict:
         since = datetime.now(timezone.utc) - timedelta(minutes=minutes)
 
         with _get_db_conn() as conn:
-            # Get active AIs from notes, messages, and locks
-            activities = conn.execute('''
-                SELECT DISTINCT author as ai_id, MAX(created) as last_seen
-                FROM notes
-                WHERE created > ? AND type IS NULL
-                GROUP BY author
-            ''', [since]).fetchall()
-
-            # Add message activity if available
-            try:
-                msg_activity = conn.execute('''
-                    SELECT DISTINCT from_ai as ai_id, MAX(created) as last_seen
-                    FROM messages
-                    WHERE created > ?
-                    GROUP BY from_ai
-                ''', [since]).fetchall()
-                activities.extend(msg_activity)
-            except:
-                pass
-
-            # Add lock holders
+            # Get active AIs from notes, messages, and locks in one pass
+            sources = ['notes'] + [t for t in ('messages', 'locks') if t in _activity_tables(conn)]
             try:
-                lock_activity = conn.execute('''
-                    SELECT DISTINCT held_by as ai_id, MAX(acquired_at) as last_seen
-                    FROM locks
-                    WHERE acquired_at > ?
-                    GROUP BY held_by
+                sorted_ais = conn.execute(f'''
+                    SELECT ai_id, MAX(last_seen) AS last_seen
+                    FROM ({' UNION ALL '.join(_ACTIVITY_SQL[t] for t in sources)}) activity
+                    GROUP BY ai_id
+                    ORDER BY last_seen DESC
+                ''', [since] * len(sources)).fetchall()
+            except Exception as e:
+                # An optional table with an unexpected shape shouldn't hide note authors
+                logging.debug(f"who_is_here activity union failed, using notes only: {e}")
+                sorted_ais = conn.execute(f'''
+                    SELECT ai_id, MAX(last_seen) AS last_seen
+                    FROM ({_ACTIVITY_SQL['notes']}) activity
+                    GROUP BY ai_id
+                    ORDER BY last_seen DESC
                 ''', [since]).fetchall()
-                activities.extend(lock_activity)
-            except:
-                pass
 
-        # Deduplicate and get most recent activity per AI
-        ai_activity = {}
-        for ai_id, last_seen in activities:
-            if ai_id not in ai_activity or last_seen > ai_activity[ai_id]:
-                ai_activity[ai_id] = last_seen
-
-        if not ai_activity:
+        if not sorted_ais:
             return ""  # No active AIs
 
-        # Sort by most recent activity
-        sorted_ais = sorted(ai_activity.items(), key=lambda x: x[1], reverse=True)
-
-        if OUTPUT_FORMAT == 'pipe':
-            lines = []
-            for ai_id, last_seen in sorted_ais:
-                # Add emoji only for CLI (not MCP)
-                active_marker = "🟢" if (ai_id == CURRENT_AI_ID and IS_CLI) else ""
-                parts = [
-                    ai_id,
-                    format_time_compact(last_seen),
-                    active_marker
-                ]
-                lines.append('|'.join(pipe_escape(p) for p in parts if p))
-            return '\n'.join(lines)
-        else:
-            formatted = []
-            for ai_id, last_seen in sorted_ais:
-                formatted.append({
-                    'ai_id': ai_id,
-                    'last_seen': format_time_compact(last_seen),
-                    'is_me': ai_id == CURRENT_AI_ID
-                })
-            return '\n'.join([f"{ai['ai_id']}|{ai['last_seen']}" for ai in formatted])
+        fmt = _format_time_cached
+        # Add emoji only for CLI (not MCP)
+        return '\n'.join(
+            '|'.join(pipe_escape(p) for p in (
+                ai_id, fmt(last_seen), "🟢" if (ai_id == CURRENT_AI_ID and IS_CLI) else ""
+            ) if p)
+            for ai_id, last_seen in sorted_ais
+        )
 
     except Exception as e:
         logging.error(f"Error in who_is_here: {e}")
@@ -2053,57 +2673,203 @@ def what_are_they_doing(ai_id: str = None, limit: int = 10, **kwargs) -> Dict:
         with _get_db_conn() as conn:
             if ai_id:
                 # Specific AI
-                query = '''
+                activities = conn.execute('''
                     SELECT author, 'wrote' as action, summary, created
                     FROM notes
                     WHERE author = ? AND type IS NULL
                     ORDER BY created DESC
                     LIMIT ?
-                '''
-                params = [ai_id, limit]
+                ''', [str(ai_id), limit]).fetchall()
             else:
                 # All AIs
-                query = '''
+                activities = conn.execute('''
                     SELECT author, 'wrote' as action, summary, created
                     FROM notes
                     WHERE type IS NULL
                     ORDER BY created DESC
                     LIMIT ?
-                '''
-                params = [limit]
-
-            activities = conn.execute(query, params).fetchall()
+                ''', [limit]).fetchall()
 
         if not activities:
             return ""  # No activity
 
-        if OUTPUT_FORMAT == 'pipe':
-            lines = []
-            for author, action, summary, created in activities:
-                parts = [
-                    author,
-                    action,
-                    format_time_compact(created),
-                    summary[:80] if summary else ""
-                ]
-                lines.append('|'.join(pipe_escape(p) for p in parts))
-            return '\n'.join(lines)
-        else:
-            formatted = []
-            for author, action, summary, created in activities:
-                formatted.append({
-                    'ai': author,
-                    'action': action,
-                    'time': format_time_compact(created),
-                    'summary': summary
-                })
-            return '\n'.join([f"{a['ai']}|{a['action']}|{a['time']}|{a.get('summary', '')}" for a in formatted])
+        fmt = _format_time_cached
+        # action is the SQL literal 'wrote' - nothing to escape
+        esc = pipe_escape
+        return '\n'.join(
+            f"{esc(author)}|{action}|{esc(fmt(created))}|{esc(summary[:80]) if summary else ''}"
+            for author, action, summary, created in activities
+        )
 
     except Exception as e:
         logging.error(f"Error in what_are_they_doing: {e}")
         return "!error:failed"
 
 
+# Dashboards poll the snapshot and progress report back to back; both read the
+# same task, event and presence stats, so share them for a few seconds.
+OBS_CACHE_TTL_SECONDS = 3
+try:
+    _obs_cache = CachedResult(ttl_seconds=OBS_CACHE_TTL_SECONDS, max_entries=64)
+except NameError:
+    _obs_cache = None
+
+def _obs_cached(kind: str, limit: int, fetch: Callable[[], Any]) -> Any:
+    """Return fetch() memoized per (kind, teambook, limit) for OBS_CACHE_TTL_SECONDS"""
+    if _obs_cache is None:
+        return fetch()
+    key = (kind, CURRENT_TEAMBOOK, limit)
+    value = _obs_cache.get(key)
+    if value is None:
+        value = fetch()
+        _obs_cache.set(key, value)
+    return value
+
+def _invalidate_obs_cache():
+    """Drop memoized observability stats after a queue or watch mutation"""
+    if _obs_cache is not None:
+        _obs_cache.clear()
+
+def _invalidates_obs_cache(func: Callable) -> Callable:
+    """Wrap a mutating coordination/event call so the next report re-reads stats"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _invalidate_obs_cache()
+    return wrapper
+
+if COORDINATION_AVAILABLE:
+    queue_task = _invalidates_obs_cache(queue_task)
+    claim_task = _invalidates_obs_cache(claim_task)
+    complete_task = _invalidates_obs_cache(complete_task)
+
+# watch is not wrapped: the module-level watch() below replaces the imported
+# one and only checks that the note exists
+if EVENTS_AVAILABLE:
+    unwatch = _invalidates_obs_cache(unwatch)
+
+_obs_pool = None
+_obs_pool_lock = threading.Lock()
+
+def _obs_executor() -> ThreadPoolExecutor:
+    global _obs_pool
+    if _obs_pool is None:
+        with _obs_pool_lock:
+            if _obs_pool is None:
+                _obs_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="teambook-obs")
+    return _obs_pool
+
+def _fetch_task_stats(limit: int) -> Dict[str, Any]:
+    """Task totals, pending-priority hotspots and top claimers in one round-trip"""
+    backend_type, get_conn = get_coordination_backend()
+    with get_conn() as conn:
+        init_coordination_tables(conn)
+
+        # (kind, priority, claimer, n, pending, claimed, completed)
+        rows = conn.execute(
+            '''
+            SELECT 'totals', CAST(NULL AS INTEGER), CAST(NULL AS VARCHAR),
+                COUNT(*),
+                COUNT(CASE WHEN status = 'pending' THEN 1 END),
+                COUNT(CASE WHEN status = 'claimed' THEN 1 END),
+                COUNT(CASE WHEN status = 'completed' THEN 1 END)
+            FROM task_queue
+            WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
+            UNION ALL
+            SELECT 'priority', priority, NULL, n, NULL, NULL, NULL
+            FROM (
+                SELECT priority, COUNT(*) AS n
+                FROM task_queue
+                WHERE status = 'pending'
+                  AND (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
+                GROUP BY priority
+                ORDER BY priority DESC
+                LIMIT ?
+            ) hot
+            UNION ALL
+            SELECT 'claimer', NULL, claimed_by, n, NULL, NULL, NULL
+            FROM (
+                SELECT claimed_by, COUNT(*) AS n
+                FROM task_queue
+                WHERE status = 'claimed' AND claimed_by IS NOT NULL
+                  AND (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
+                GROUP BY claimed_by
+                ORDER BY COUNT(*) DESC
+                LIMIT ?
+            ) busy
+            ''',
+            [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK,
+             CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit,
+             CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
+        ).fetchall()
+
+    # UNION ALL doesn't preserve branch ordering - restore it here
+    return {
+        'backend': backend_type,
+        'totals': next((tuple(row[3:]) for row in rows if row[0] == 'totals'), None),
+        'priority': sorted(
+            ((row[1], row[3]) for row in rows if row[0] == 'priority'),
+            key=lambda row: row[0], reverse=True
+        ),
+        'claimers': sorted(
+            ((row[2], row[3]) for row in rows if row[0] == 'claimer'),
+            key=lambda row: row[1], reverse=True
+        ),
+    }
+
+def _fetch_event_stats(limit: int) -> Dict[str, Any]:
+    """Unseen count, recent events and watcher groups in one round-trip"""
+    with _get_db_conn() as conn:
+        init_events_tables(conn)
+
+        # (kind, item_type, event_type, actor, ts, n)
+        rows = conn.execute(
+            '''
+            SELECT 'unseen', CAST(NULL AS VARCHAR), CAST(NULL AS VARCHAR),
+                   CAST(NULL AS VARCHAR), CAST(NULL AS TIMESTAMP), COUNT(*)
+            FROM event_deliveries d
+            JOIN events e ON e.id = d.event_id
+            WHERE d.seen = FALSE
+              AND (? IS NULL OR e.teambook_name = ? OR e.teambook_name IS NULL)
+            UNION ALL
+            SELECT 'recent', item_type, event_type, actor_ai_id, created_at, NULL
+            FROM (
+                SELECT item_type, event_type, actor_ai_id, created_at
+                FROM events
+                WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
+                ORDER BY created_at DESC
+                LIMIT ?
+            ) recent
+            UNION ALL
+            SELECT 'watch', item_type, NULL, NULL, last_activity, watchers
+            FROM (
+                SELECT item_type, COUNT(*) AS watchers, MAX(last_activity) AS last_activity
+                FROM watches
+                WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
+                GROUP BY item_type
+                ORDER BY MAX(last_activity) DESC
+                LIMIT ?
+            ) watched
+            ''',
+            [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK,
+             CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit,
+             CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
+        ).fetchall()
+
+    return {
+        'unseen': next((row[5] for row in rows if row[0] == 'unseen'), 0),
+        'recent': sorted(
+            ((row[1], row[2], row[3], row[4]) for row in rows if row[0] == 'recent'),
+            key=lambda row: row[3], reverse=True
+        ),
+        'watches': sorted(
+            ((row[1], row[5], row[4]) for row in rows if row[0] == 'watch'),
+            key=lambda row: (row[2] is not None, row[2]), reverse=True
+        ),
+    }
+
 def teambook_observability_snapshot(
     limit: int = 25,
     include_events: bool = True,
@@ -2122,48 +2888,34 @@ def teambook_observability_snapshot(
         'generated_at': datetime.now(timezone.utc).isoformat()
     }
 
+    # Tasks (coordination backend) and events (local DB) are independent -
+    # fetch them in the background while presence is read on this thread
+    if include_tasks:
+        tasks_future = _obs_executor().submit(_obs_cached, 'tasks', limit, lambda: _fetch_task_stats(limit))
+    if include_events:
+        events_future = _obs_executor().submit(_obs_cached, 'events', limit, lambda: _fetch_event_stats(limit))
+
     if include_presence:
-        snapshot['presence'] = presence_snapshot(limit=limit)
+        records = _obs_cached('presence', limit, lambda: get_presence_overview(limit=limit))
+        snapshot['presence'] = {
+            'teambook': CURRENT_TEAMBOOK,
+            'count': len(records),
+            'status_breakdown': summarize_presence_categories(records),
+            'records': records
+        }
 
     if include_tasks:
         try:
-            backend_type, get_conn = get_coordination_backend()
-            with get_conn() as conn:
-                init_coordination_tables(conn)
-
-                stats = conn.execute(
-                    '''
-                    SELECT
-                        COUNT(*) as total,
-                        COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending,
-                        COUNT(CASE WHEN status = 'claimed' THEN 1 END) as claimed,
-                        COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed
-                    FROM task_queue
-                    WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                    ''',
-                    [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK]
-                ).fetchone()
-
-                priority_rows = conn.execute(
-                    '''
-                    SELECT priority, COUNT(*)
-                    FROM task_queue
-                    WHERE status = 'pending'
-                      AND (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                    GROUP BY priority
-                    ORDER BY priority DESC
-                    LIMIT ?
-                    ''',
-                    [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-                ).fetchall()
+            task_stats = tasks_future.result()
+            stats = task_stats['totals']
 
             snapshot['tasks'] = {
-                'backend': backend_type,
+                'backend': task_stats['backend'],
                 'total': stats[0] if stats else 0,
                 'pending': stats[1] if stats else 0,
                 'claimed': stats[2] if stats else 0,
                 'completed': stats[3] if stats else 0,
-                'priority_hotspots': {str(row[0]): row[1] for row in priority_rows}
+                'priority_hotspots': {str(row[0]): row[1] for row in task_stats['priority']}
             }
         except Exception as exc:
             logging.debug(f"Task snapshot failed: {exc}")
@@ -2171,42 +2923,10 @@ def teambook_observability_snapshot(
 
     if include_events:
         try:
-            with _get_db_conn() as conn:
-                init_events_tables(conn)
-
-                unseen = conn.execute(
-                    '''
-                    SELECT COUNT(*)
-                    FROM event_deliveries d
-                    JOIN events e ON e.id = d.event_id
-                    WHERE d.seen = FALSE
-                      AND (? IS NULL OR e.teambook_name = ? OR e.teambook_name IS NULL)
-                    ''',
-                    [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK]
-                ).fetchone()[0]
-
-                recent_rows = conn.execute(
-                    '''
-                    SELECT item_type, event_type, actor_ai_id, created_at
-                    FROM events
-                    WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                    ''',
-                    [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-                ).fetchall()
-
-                watcher_rows = conn.execute(
-                    '''
-                    SELECT item_type, COUNT(*), MAX(last_activity)
-                    FROM watches
-                    WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                    GROUP BY item_type
-                    ORDER BY MAX(last_activity) DESC
-                    LIMIT ?
-                    ''',
-                    [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-                ).fetchall()
+            event_stats = events_future.result()
+            unseen = event_stats['unseen']
+            recent_rows = event_stats['recent']
+            watcher_rows = event_stats['watches']
 
             snapshot['events'] = {
                 'unseen': unseen,
@@ -2233,6 +2953,12 @@ def teambook_observability_snapshot(
             snapshot['events'] = {'error': 'unavailable'}
 
     try:
+        if ORJSON_AVAILABLE:
+            # Datetimes go through default=str so output matches json.dumps
+            return orjson.dumps(
+                snapshot, default=str,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            ).decode('utf-8')
         return json.dumps(snapshot, default=str)
     except TypeError:
         lines = [f"teambook:{snapshot['teambook']}"]
@@ -2257,53 +2983,20 @@ def ai_collective_progress_report(limit: int = 25, **kwargs) -> str:
     except Exception:
         limit = 25
 
-    presence_records = get_presence_overview(limit=limit)
-    status_counts = Counter(record.get('status', '').lower() for record in presence_records)
+    presence_records = _obs_cached('presence', limit, lambda: get_presence_overview(limit=limit))
+    # Statuses are already lowercase PresenceStatus values from the presence layer
+    status_counts = {'online': 0, 'away': 0, 'offline': 0}
+    for record in presence_records:
+        status = record.get('status')
+        if status in status_counts:
+            status_counts[status] += 1
     category_summary = summarize_presence_categories(presence_records) if presence_records else {}
 
     try:
-        backend_type, get_conn = get_coordination_backend()
-        with get_conn() as conn:
-            init_coordination_tables(conn)
-
-            stats = conn.execute(
-                '''
-                SELECT
-                    COUNT(*) as total,
-                    COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending,
-                    COUNT(CASE WHEN status = 'claimed' THEN 1 END) as claimed,
-                    COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed
-                FROM task_queue
-                WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                ''',
-                [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK]
-            ).fetchone()
-
-            backlog = conn.execute(
-                '''
-                SELECT priority, COUNT(*)
-                FROM task_queue
-                WHERE status = 'pending'
-                  AND (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                GROUP BY priority
-                ORDER BY priority DESC
-                LIMIT ?
-                ''',
-                [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-            ).fetchall()
-
-            claimer_rows = conn.execute(
-                '''
-                SELECT claimed_by, COUNT(*)
-                FROM task_queue
-                WHERE status = 'claimed' AND claimed_by IS NOT NULL
-                  AND (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                GROUP BY claimed_by
-                ORDER BY COUNT(*) DESC
-                LIMIT ?
-                ''',
-                [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-            ).fetchall()
+        task_stats = _obs_cached('tasks', limit, lambda: _fetch_task_stats(limit))
+        stats = task_stats['totals']
+        backlog = task_stats['priority']
+        claimer_rows = task_stats['claimers']
 
         tasks_line = f"tasks|total:{stats[0] if stats else 0}|pending:{stats[1] if stats else 0}|claimed:{stats[2] if stats else 0}|completed:{stats[3] if stats else 0}"
         backlog_line = ""
@@ -2319,30 +3012,9 @@ def ai_collective_progress_report(limit: int = 25, **kwargs) -> str:
         claimer_line = ""
 
     try:
-        with _get_db_conn() as conn:
-            init_events_tables(conn)
-
-            unseen = conn.execute(
-                '''
-                SELECT COUNT(*)
-                FROM event_deliveries d
-                JOIN events e ON e.id = d.event_id
-                WHERE d.seen = FALSE
-                  AND (? IS NULL OR e.teambook_name = ? OR e.teambook_name IS NULL)
-                ''',
-                [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK]
-            ).fetchone()[0]
-
-            recent = conn.execute(
-                '''
-                SELECT event_type
-                FROM events
-                WHERE (? IS NULL OR teambook_name = ? OR teambook_name IS NULL)
-                ORDER BY created_at DESC
-                LIMIT ?
-                ''',
-                [CURRENT_TEAMBOOK, CURRENT_TEAMBOOK, limit]
-            ).fetchall()
+        event_stats = _obs_cached('events', limit, lambda: _fetch_event_stats(limit))
+        unseen = event_stats['unseen']
+        recent = [(row[1],) for row in event_stats['recent']]
 
         event_counter = Counter(row[0] for row in recent if row and row[0])
         events_line = f"events|unseen:{unseen}|recent:" + ','.join(f"{etype}:{count}" for etype, count in event_counter.most_common(5))
@@ -2370,6 +3042,71 @@ def ai_collective_progress_report(limit: int = 25, **kwargs) -> str:
     return '\n'.join(line for line in lines if line)
 
 
+def _graph_components(node_ids: frozenset, edge_rows: List[Tuple[int, int]]) -> Tuple[List[List[int]], List[int], int]:
+    """
+    Connected components of the note graph via union-find.
+
+    Returns (components, edge count per component, distinct undirected edges).
+    Components and edge counts come out of one sweep over the edges.
+    """
+    parent = {node: node for node in node_ids}
+    rank = dict.fromkeys(node_ids, 0)
+    root_edges = dict.fromkeys(node_ids, 0)
+
+    def find(node: int) -> int:
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    edge_pairs = set()
+    for from_id, to_id in edge_rows:
+        if from_id not in node_ids or to_id not in node_ids:
+            continue
+        pair = (from_id, to_id) if from_id <= to_id else (to_id, from_id)
+        if pair in edge_pairs:
+            continue
+        edge_pairs.add(pair)
+
+        root_a, root_b = find(from_id), find(to_id)
+        if root_a == root_b:
+            root_edges[root_a] += 1
+            continue
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+        root_edges[root_a] += root_edges[root_b] + 1
+
+    members: Dict[int, List[int]] = {}
+    for node in node_ids:
+        members.setdefault(find(node), []).append(node)
+    components = list(members.values())
+    edge_counts = [root_edges[root] for root in members]
+    return components, edge_counts, len(edge_pairs)
+
+def _graph_components_scipy(node_ids: frozenset, edge_rows: List[Tuple[int, int]]) -> Tuple[List[List[int]], List[int], int]:
+    """_graph_components on scipy's compiled connected_components"""
+    ids = np.sort(np.fromiter(node_ids, dtype=np.int64, count=len(node_ids)))
+    edges = np.asarray(edge_rows, dtype=np.int64).reshape(-1, 2)
+    edges = edges[np.isin(edges[:, 0], ids) & np.isin(edges[:, 1], ids)]
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+
+    # Dense indices: position of each id in the sorted id array
+    rows = np.searchsorted(ids, edges[:, 0])
+    cols = np.searchsorted(ids, edges[:, 1])
+    graph = csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(len(ids), len(ids)))
+    component_count, labels = connected_components(graph, directed=False)
+
+    edge_counts = np.bincount(labels[rows], minlength=component_count)
+    order = np.argsort(labels, kind='stable')
+    bounds = np.cumsum(np.bincount(labels, minlength=component_count))[:-1]
+    components = [part.tolist() for part in np.split(ids[order], bounds)]
+    return components, edge_counts.tolist(), len(edges)
+
 def teambook_vector_graph_diagnostics(limit: int = 5, include_samples: bool = True, **kwargs) -> str:
     """Surface graph connectivity diagnostics for semantic notes."""
     try:
@@ -2384,7 +3121,7 @@ def teambook_vector_graph_diagnostics(limit: int = 5, include_samples: bool = Tr
         ).fetchall()
         edge_rows = conn.execute('SELECT from_id, to_id FROM edges').fetchall()
 
-    node_ids = {row[0] for row in node_rows}
+    node_ids = frozenset(row[0] for row in node_rows)
     if not node_ids:
         diagnostics = {
             'teambook': CURRENT_TEAMBOOK or 'private',
@@ -2395,41 +3132,23 @@ def teambook_vector_graph_diagnostics(limit: int = 5, include_samples: bool = Tr
         }
         return json.dumps(diagnostics)
 
-    adjacency: Dict[int, set] = {node: set() for node in node_ids}
-    edge_pairs = set()
-    for from_id, to_id in edge_rows:
-        if from_id in node_ids and to_id in node_ids:
-            adjacency[from_id].add(to_id)
-            adjacency[to_id].add(from_id)
-            edge_pairs.add(tuple(sorted((from_id, to_id))))
-
-    visited = set()
-    components: List[List[int]] = []
-    for node in node_ids:
-        if node in visited:
-            continue
-        stack = [node]
-        component = []
-        while stack:
-            current = stack.pop()
-            if current in visited:
-                continue
-            visited.add(current)
-            component.append(current)
-            stack.extend(adjacency[current] - visited)
-        components.append(component)
+    if SCIPY_GRAPH_AVAILABLE:
+        components, edge_counts, total_edges = _graph_components_scipy(node_ids, edge_rows)
+    else:
+        components, edge_counts, total_edges = _graph_components(node_ids, edge_rows)
 
-    edge_lookup = edge_pairs
+    # Only the `limit` smallest clusters are reported - no need to sort them all
     clusters = []
-    for component in sorted(components, key=len):
-        if len(clusters) >= limit:
-            break
-        subset = set(component)
-        edge_count = sum(1 for edge in edge_lookup if edge[0] in subset and edge[1] in subset)
-        possible_edges = max(1, len(component) * (len(component) - 1) / 2)
-        density = round(edge_count / possible_edges, 3)
+    for index in heapq.nsmallest(limit, range(len(components)), key=lambda i: len(components[i])):
+        component = components[index]
+        edge_count = edge_counts[index]
+        size = len(component)
+        if size < 2:
+            density = 0.0  # A lone note has no pairs (self-loops don't count)
+        else:
+            density = round(edge_count / (size * (size - 1) // 2), 3)
         cluster_info = {
-            'size': len(component),
+            'size': size,
             'edge_count': edge_count,
             'edge_density': density
         }
@@ -2437,12 +3156,12 @@ def teambook_vector_graph_diagnostics(limit: int = 5, include_samples: bool = Tr
             cluster_info['sample_nodes'] = component[:min(3, len(component))]
         clusters.append(cluster_info)
 
-    disconnected = sum(1 for comp in components if len(comp) == 1 and not adjacency[comp[0]])
+    disconnected = sum(1 for count, comp in zip(edge_counts, components) if len(comp) == 1 and not count)
 
     diagnostics = {
         'teambook': CURRENT_TEAMBOOK or 'private',
         'total_nodes': len(node_ids),
-        'total_edges': len(edge_pairs),
+        'total_edges': total_edges,
         'disconnected_notes': disconnected,
         'clusters': clusters
     }
@@ -2480,117 +3199,132 @@ def watch(note_id: Any = None, **kwargs) -> Dict:
 
 # ============= BATCH OPERATIONS =============
 
+_batch_op_map = None
+
+def _build_batch_op_map() -> Dict[str, Callable]:
+    """Operation name -> function for batch(); built once on first use"""
+    op_map = {
+        'write': write, 'write_many': write_many, 'read': read,
+        'remember': remember,
+        'pin_note': pin_note, 'pin': pin,
+        'unpin_note': unpin_note, 'unpin': unpin,
+        'vault_store': vault_store,
+        'vault_retrieve': vault_retrieve,
+        'get_full_note': get_full_note, 'get': get,
+        'status': get_status, 'vault_list': vault_list,
+        'create_teambook': create_teambook,
+        'join_teambook': join_teambook,
+        'use_teambook': use_teambook,
+        'list_teambooks': list_teambooks,
+        'claim': claim, 'release': release, 'assign': assign,
+        'evolve': evolve, 'attempt': attempt,
+        'create_attempts': create_attempts,
+        'attempts': attempts, 'combine': combine,
+        # Observability
+        'who_is_here': who_is_here,
+        'what_are_they_doing': what_are_they_doing,
+        'watch': watch
+    }
+
+    # Add messaging functions if available
+    if MESSAGING_AVAILABLE:
+        op_map.update({
+            'broadcast': broadcast,
+            'direct_message': direct_message, 'dm': direct_message,
+            'subscribe': subscribe, 'sub': subscribe,
+            'unsubscribe': unsubscribe, 'unsub': unsubscribe,
+            'read_channel': read_channel,
+            'read_dms': read_dms,
+            'message_stats': message_stats
+        })
+
+    # Add coordination functions if available
+    if COORDINATION_AVAILABLE:
+        op_map.update({
+            'acquire_lock': acquire_lock, 'lock': acquire_lock,
+            'release_lock': release_lock, 'unlock': release_lock,
+            'extend_lock': extend_lock,
+            'list_locks': list_locks,
+            'queue_task': queue_task,
+            'claim_task': claim_task,
+            'complete_task': complete_task,
+            'queue_stats': queue_stats
+        })
+
+    # Add event system functions if available
+    if EVENTS_AVAILABLE:
+        op_map.update({
+            'watch': watch,
+            'unwatch': unwatch,
+            'get_events': get_events,
+            'list_watches': list_watches,
+            'watch_stats': watch_stats
+        })
+
+    # Add enhanced evolution functions if available
+    if EVOLUTION_V2_AVAILABLE:
+        op_map.update({
+            'evolve': evolve,
+            'contribute': contribute,
+            'rank_contribution': rank_contribution, 'rank': rank_contribution,
+            'contributions': contributions,
+            'synthesize': synthesize,
+            'conflicts': conflicts,
+            'vote': vote
+        })
+
+    return op_map
+
+def _add_batch_pipe_lines(batch_lines: List[str], r: Any):
+    """Append the pipe-format line(s) for one batch result"""
+    # Most tools return pipe strings - only dicts need key dispatch
+    if not isinstance(r, dict):
+        batch_lines.append(str(r))
+    elif "error" in r:
+        batch_lines.append(f"error:{r['error']}")
+    elif "saved" in r:
+        batch_lines.append(r["saved"])
+    elif isinstance(r.get("notes"), list):
+        batch_lines.extend(r["notes"])
+    elif "status" in r:
+        batch_lines.append(r["status"])
+    elif isinstance(r.get("teambooks"), list):
+        batch_lines.extend(r["teambooks"])
+    else:
+        batch_lines.append(str(list(r.values())[0]) if len(r) == 1 else str(r))
+
+def _add_batch_str_line(batch_lines: List[str], r: Any):
+    """Append one batch result as-is (non-pipe output formats)"""
+    batch_lines.append(str(r))
+
 def batch(operations: List[Dict] = None, **kwargs) -> Dict:
     """Execute multiple operations efficiently"""
+    global _batch_op_map
     try:
-        from teambook_shared import BATCH_MAX
-        
         operations = kwargs.get('operations', operations or [])
         if not operations:
             return "!batch_failed:no_operations"
-        if len(operations) > BATCH_MAX:
-            return f"!batch_failed:max_exceeded:{BATCH_MAX}"
-        
-        # Map all operations to functions
-        op_map = {
-            'write': write, 'read': read,
-            'remember': remember,
-            'pin_note': pin_note, 'pin': pin,
-            'unpin_note': unpin_note, 'unpin': unpin,
-            'vault_store': vault_store,
-            'vault_retrieve': vault_retrieve,
-            'get_full_note': get_full_note, 'get': get,
-            'status': get_status, 'vault_list': vault_list,
-            'create_teambook': create_teambook,
-            'join_teambook': join_teambook,
-            'use_teambook': use_teambook,
-            'list_teambooks': list_teambooks,
-            'claim': claim, 'release': release, 'assign': assign,
-            'evolve': evolve, 'attempt': attempt,
-            'attempts': attempts, 'combine': combine,
-            # Observability
-            'who_is_here': who_is_here,
-            'what_are_they_doing': what_are_they_doing,
-            'watch': watch
-        }
+        if len(operations) > _ts.BATCH_MAX:
+            return f"!batch_failed:max_exceeded:{_ts.BATCH_MAX}"
+        
+        if _batch_op_map is None:
+            _batch_op_map = _build_batch_op_map()
+        op_map = _batch_op_map
 
-        # Add messaging functions if available
-        if MESSAGING_AVAILABLE:
-            op_map.update({
-                'broadcast': broadcast,
-                'direct_message': direct_message, 'dm': direct_message,
-                'subscribe': subscribe, 'sub': subscribe,
-                'unsubscribe': unsubscribe, 'unsub': unsubscribe,
-                'read_channel': read_channel,
-                'read_dms': read_dms,
-                'message_stats': message_stats
-            })
-
-        # Add coordination functions if available
-        if COORDINATION_AVAILABLE:
-            op_map.update({
-                'acquire_lock': acquire_lock, 'lock': acquire_lock,
-                'release_lock': release_lock, 'unlock': release_lock,
-                'extend_lock': extend_lock,
-                'list_locks': list_locks,
-                'queue_task': queue_task,
-                'claim_task': claim_task,
-                'complete_task': complete_task,
-                'queue_stats': queue_stats
-            })
-
-        # Add event system functions if available
-        if EVENTS_AVAILABLE:
-            op_map.update({
-                'watch': watch,
-                'unwatch': unwatch,
-                'get_events': get_events,
-                'list_watches': list_watches,
-                'watch_stats': watch_stats
-            })
-
-        # Add enhanced evolution functions if available
-        if EVOLUTION_V2_AVAILABLE:
-            op_map.update({
-                'evolve': evolve,
-                'contribute': contribute,
-                'rank_contribution': rank_contribution, 'rank': rank_contribution,
-                'contributions': contributions,
-                'synthesize': synthesize,
-                'conflicts': conflicts,
-                'vote': vote
-            })
-
-        results = []
+        # Format each result as it is produced instead of holding them all
+        batch_lines = []
+        add_lines = _add_batch_pipe_lines if _IS_PIPE else _add_batch_str_line
         for op in operations:
             op_type = op.get('type')
-            if op_type in op_map:
-                results.append(op_map[op_type](**op.get('args', {})))
+            func = op_map.get(op_type)
+            if func is None:
+                r = f"!batch_error:unknown_op:{op_type}"
             else:
-                results.append(f"!batch_error:unknown_op:{op_type}")
-        
-        if OUTPUT_FORMAT == 'pipe':
-            batch_lines = []
-            for r in results:
-                if "error" in r:
-                    batch_lines.append(f"error:{r['error']}")
-                elif "saved" in r:
-                    batch_lines.append(r["saved"])
-                elif "notes" in r and isinstance(r["notes"], list):
-                    batch_lines.extend(r["notes"])
-                elif "status" in r:
-                    batch_lines.append(r["status"])
-                elif "teambooks" in r and isinstance(r["teambooks"], list):
-                    batch_lines.extend(r["teambooks"])
-                else:
-                    if isinstance(r, dict):
-                        batch_lines.append(str(list(r.values())[0]) if len(r) == 1 else str(r))
-                    else:
-                        batch_lines.append(str(r))
-            
-            return f"batch:{len(results)}|" + '\n'.join(batch_lines)
-        else:
-            return f"batch:{len(results)}|" + '\n'.join(str(r) for r in results)
+                r = func(**op.get('args', {}))
+
+            add_lines(batch_lines, r)
+
+        return f"batch:{len(operations)}|" + '\n'.join(batch_lines)
         
     except Exception as e:
         logging.error(f"Error in batch: {e}")
@@ -2839,7 +3573,6 @@ def add_hook(hook_type: str = None, filter: str = None, action: str = "notify",
             return {"error": "hook_type_required", "available_types": types_result.get("hook_types", [])}
         
         # Parse filter if provided as string
-        import json
         filter_data = None
         if filter:
             try:
@@ -3001,7 +3734,7 @@ def create_project(name: str = None, goal: str = None, **kwargs) -> Dict:
         content = f"Goal: {goal}" if goal else "Project coordination workspace"
         summary = f"Project: {name}"
 
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         if adapter:
             project_id = adapter.write_note(
                 content=content,
@@ -3013,15 +3746,14 @@ def create_project(name: str = None, goal: str = None, **kwargs) -> Dict:
         else:
             # Fallback to DuckDB if no adapter
             with _get_db_conn() as conn:
-                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
-                project_id = max_id + 1
-                now = datetime.now(timezone.utc)
-                conn.execute('''
-                    INSERT INTO notes (id, content, summary, type, owner, author, teambook_name, created, tags)
-                    VALUES (?, ?, ?, 'project', ?, ?, ?, ?, ?)
-                ''', [project_id, content, summary, CURRENT_AI_ID, CURRENT_AI_ID, CURRENT_TEAMBOOK, now, ['project', 'coordination']])
+                project_id = _insert_with_new_id(conn, 'notes', [
+                    'content', 'summary', 'type', 'owner', 'author', 'teambook_name', 'created', 'tags'
+                ], [
+                    content, summary, 'project', CURRENT_AI_ID, CURRENT_AI_ID, CURRENT_TEAMBOOK,
+                    datetime.now(timezone.utc), ['project', 'coordination']
+                ])
 
-        _log_operation_to_db('create_project')
+        _log_operation('create_project')
 
         # Log coordination event for ambient awareness
         _log_coordination_event(
@@ -3084,7 +3816,7 @@ def add_task_to_project(project_id: int = None, title: str = None, status: str =
         content = title
         summary = f"Task: {title[:50]}"
 
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         if adapter:
             task_id = adapter.write_note(
                 content=content,
@@ -3097,15 +3829,14 @@ def add_task_to_project(project_id: int = None, title: str = None, status: str =
         else:
             # Fallback to DuckDB
             with _get_db_conn() as conn:
-                max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notes").fetchone()[0]
-                task_id = max_id + 1
-                now = datetime.now(timezone.utc)
-                conn.execute('''
-                    INSERT INTO notes (id, content, summary, type, parent_id, owner, author, teambook_name, created, tags)
-                    VALUES (?, ?, ?, 'task', ?, NULL, ?, ?, ?, ?)
-                ''', [task_id, content, summary, project_id, CURRENT_AI_ID, CURRENT_TEAMBOOK, now, ['task', f'status:{status}', f'priority:{priority}']])
+                task_id = _insert_with_new_id(conn, 'notes', [
+                    'content', 'summary', 'type', 'parent_id', 'owner', 'author', 'teambook_name', 'created', 'tags'
+                ], [
+                    content, summary, 'task', project_id, None, CURRENT_AI_ID, CURRENT_TEAMBOOK,
+                    datetime.now(timezone.utc), ['task', f'status:{status}', f'priority:{priority}']
+                ])
 
-        _log_operation_to_db('add_task')
+        _log_operation('add_task')
 
         # Log coordination event for ambient awareness
         _log_coordination_event(
@@ -3150,7 +3881,7 @@ def list_project_tasks(project_id: int = None, status: str = None, assignee: str
         assignee = str(kwargs.get('assignee', assignee or '')).strip()
 
         # Use storage adapter for enterprise-grade backend routing
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
 
         if adapter:
             # Get tasks via adapter (already returns dict format)
@@ -3249,7 +3980,7 @@ def project_board(project_id: int = None, **kwargs) -> str:
             return "!error:project_id_required"
 
         # Use storage adapter for enterprise-grade backend routing
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
 
         if adapter:
             # Get project details via adapter
@@ -3395,7 +4126,7 @@ def project_board(project_id: int = None, **kwargs) -> str:
             lines.append("")
             lines.append(f"ASSIGNEES|{len(assignees)}|{pipe_escape(','.join(sorted(assignees)))}")
 
-        _log_operation_to_db('project_board')
+        _log_operation('project_board')
 
         return '\n'.join(lines)
 
@@ -3435,7 +4166,7 @@ def complete_project_task(task_id: int = None, result: str = None, **kwargs) ->
         result = str(kwargs.get('result', result or '')).strip()
 
         # Use storage adapter for enterprise-grade backend routing
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
 
         if adapter:
             # Get task via adapter
@@ -3501,7 +4232,7 @@ def complete_project_task(task_id: int = None, result: str = None, **kwargs) ->
                         [f"\n\n✅ COMPLETED: {result}", task_id]
                     )
 
-        _log_operation_to_db('complete_task')
+        _log_operation('complete_task')
 
         # Log coordination event for ambient awareness
         if adapter and task_note:
@@ -3551,7 +4282,7 @@ def claim_task_by_id(task_id: int = None, **kwargs) -> Dict:
         if not task_id:
             return "!error:task_id_required"
 
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         if adapter:
             # Get task to verify it exists and is claimable
             task = adapter.get_note(task_id)
@@ -3611,7 +4342,7 @@ def claim_task_by_id(task_id: int = None, **kwargs) -> Dict:
                 if not claimed or claimed[0] != CURRENT_AI_ID:
                     return "!claim_race_lost"
 
-        _log_operation_to_db('claim_task_by_id')
+        _log_operation('claim_task_by_id')
 
         # Log coordination event for ambient awareness
         _log_coordination_event(
@@ -3660,7 +4391,7 @@ def update_task_status(task_id: int = None, status: str = None, notes: str = Non
 
         notes_text = str(kwargs.get('notes', notes or '')).strip()
 
-        adapter = _get_storage_adapter(CURRENT_TEAMBOOK)
+        adapter = _current_adapter()
         if adapter:
             task = adapter.get_note(task_id)
             if not task:
@@ -3694,7 +4425,7 @@ def update_task_status(task_id: int = None, status: str = None, notes: str = Non
 
                 conn.execute('UPDATE notes SET tags = ?, content = ? WHERE id = ?', [tags, content, task_id])
 
-        _log_operation_to_db('update_task_status')
+        _log_operation('update_task_status')
 
         return f"task:{task_id}|{status}"
 
@@ -34,9 +34,9 @@ from teambook_api import (
     # Ownership
     claim, release, assign,
     # Evolution
-    evolve, attempt, attempts, combine,
+    evolve, attempt, create_attempts, attempts, combine,
     # Core
-    write, read, get_status, get_full_note, pin_note, unpin_note,
+    write, write_many, read, get_status, get_full_note, pin_note, unpin_note,
     # Vault
     vault_store, vault_retrieve, vault_list,
     # Batch
@@ -145,6 +145,7 @@ def handle_tools_call(params: Dict) -> Dict:
         # Core functions
         "get_status": get_status,
         "write": write,
+        "write_many": write_many,
         "read": read,
         "get_full_note": get_full_note,
         "pin_note": pin_note,
@@ -165,6 +166,7 @@ def handle_tools_call(params: Dict) -> Dict:
         # Evolution
         "evolve": evolve,
         "attempt": attempt,
+        "create_attempts": create_attempts,
         "attempts": attempts,
         "combine": combine,
         # Aliases
@@ -508,6 +510,14 @@ def main():
                         },
                         "req": ["evo_id", "content"]
                     },
+                    "create_attempts": {
+                        "desc": "Make several evolution attempts at once",
+                        "props": {
+                            "evo_id": {"type": "string"},
+                            "contents": {"type": "array", "items": {"type": "string"}}
+                        },
+                        "req": ["evo_id", "contents"]
+                    },
                     "attempts": {
                         "desc": "List attempts for an evolution",
                         "props": {"evo_id": {"type": "string"}},
@@ -531,6 +541,13 @@ def main():
                             "tags": {"type": "array", "items": {"type": "string"}}
                         }
                     },
+                    "write_many": {
+                        "desc": "Write several notes in one call",
+                        "props": {
+                            "items": {"type": "array", "items": {"type": "object"}}
+                        },
+                        "req": ["items"]
+                    },
                     "read": {
                         "desc": "Read from teambook (owner:me/none for filtering)",
                         "props": {
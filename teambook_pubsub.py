@@ -85,9 +85,9 @@ def close_redis():
 
 # ============= PUB/SUB CHANNELS =============
 
-def get_channel_name(channel_type: str, detail: str = "") -> str:
-    """Generate standardized channel names"""
-    teambook = CURRENT_TEAMBOOK or "_private"
+def get_channel_name(channel_type: str, detail: str = "", teambook: Optional[str] = None) -> str:
+    """Generate standardized channel names (for `teambook`, default: the current one)"""
+    teambook = teambook or CURRENT_TEAMBOOK or "_private"
     
     if channel_type == "note_created":
         return f"teambook:{teambook}:note:created"
@@ -104,18 +104,18 @@ def get_channel_name(channel_type: str, detail: str = "") -> str:
 
 # ============= PUBLISHING EVENTS =============
 
-def publish_event(event_type: str, data: Dict[str, Any], detail: str = ""):
-    """Publish an event to Redis"""
+def publish_event(event_type: str, data: Dict[str, Any], detail: str = "", teambook: Optional[str] = None):
+    """Publish an event to Redis (on `teambook`'s channels, default: the current one)"""
     try:
         client = get_redis_client()
-        channel = get_channel_name(event_type, detail)
+        channel = get_channel_name(event_type, detail, teambook)
         
         # Add metadata
         event_data = {
             "type": event_type,
             "data": data,
             "author": CURRENT_AI_ID,
-            "teambook": CURRENT_TEAMBOOK or "_private",
+            "teambook": teambook or CURRENT_TEAMBOOK or "_private",
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
@@ -148,12 +148,12 @@ def publish_direct_message(to_ai: str, content: str):
         "content": content
     }, detail=to_ai)
 
-def publish_broadcast(channel: str, content: str):
+def publish_broadcast(channel: str, content: str, teambook: Optional[str] = None):
     """Publish broadcast message"""
     publish_event("broadcast", {
         "channel": channel,
         "content": content
-    }, detail=channel)
+    }, detail=channel, teambook=teambook)
 
 # ============= SUBSCRIBING TO EVENTS =============
 
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Tests for teambook_api helpers that run against a scratch DuckDB database.
+
+teambook_api is imported with minimal stand-ins for the teambook runtime
+modules (teambook_shared, teambook_storage, ...) it expects beside it, so
+these tests run in the repository's own layout.
+"""
+
+import logging
+import os
+import sys
+import types
+from contextlib import contextmanager
+
+import pytest
+
+duckdb = pytest.importorskip("duckdb")
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _stub_module(name, **attrs):
+    """Module whose unknown attributes are no-op callables"""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+
+    def _missing(attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return lambda *args, **kwargs: None
+
+    module.__getattr__ = _missing
+    return module
+
+
+def _clean_text(text):
+    return ' '.join(str(text).split()) if text else ''
+
+
+_RUNTIME_STUBS = {
+    'teambook_shared': dict(
+        CURRENT_TEAMBOOK=None, CURRENT_AI_ID='tester', OUTPUT_FORMAT='pipe',
+        MAX_CONTENT_LENGTH=5000, MAX_SUMMARY_LENGTH=200, DEFAULT_RECENT=30,
+        TEAMBOOK_ROOT=None, TEAMBOOK_PRIVATE_ROOT=None, IS_CLI=False,
+        CACHE_AVAILABLE=False, BATCH_MAX=10, PAGERANK_DIRTY=False,
+        logging=logging,
+        get_default_teambook_name=lambda scope=None: None,
+        pipe_escape=lambda text: str(text).replace('|', '\\|'),
+        clean_text=_clean_text,
+        simple_summary=lambda content, max_len=150: _clean_text(content)[:max_len],
+        format_time_compact=lambda value: 'now',
+        attach_security_envelope=lambda metadata, context, purpose=None: metadata,
+    ),
+    'teambook_storage': dict(
+        collection=None, COMPRESSION_AVAILABLE=False, FTS_ENABLED=False,
+        _prepare_content_for_storage=lambda content, policy: (content, None),
+        compute_note_tamper_hash=lambda fields: 'hash',
+    ),
+    'teambook_coordination': {},
+    'teambook_events': {},
+}
+
+
+def _import_teambook_api():
+    """Import teambook_api against stand-in runtime modules, then unregister them"""
+    before = set(sys.modules)
+    saved_path = list(sys.path)
+    sys.path.insert(0, REPO_ROOT)
+    for name, attrs in _RUNTIME_STUBS.items():
+        sys.modules[name] = _stub_module(name, **attrs)
+    try:
+        import teambook_api
+    finally:
+        # teambook_api keeps its own references; don't leak stand-ins to other tests
+        for name in set(sys.modules) - before - {'teambook_api'}:
+            del sys.modules[name]
+        sys.path[:] = saved_path
+    return teambook_api
+
+
+teambook_api = _import_teambook_api()
+
+
+@pytest.fixture
+def fts_conn():
+    """In-memory notes table with a full-text index, skipped if fts can't load"""
+    conn = duckdb.connect()
+    try:
+        conn.execute("LOAD fts")
+    except Exception:
+        try:
+            conn.execute("INSTALL fts")
+            conn.execute("LOAD fts")
+        except Exception as e:
+            pytest.skip(f"DuckDB fts extension unavailable: {e}")
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, content VARCHAR, summary VARCHAR)")
+    conn.execute("""
+        INSERT INTO notes VALUES
+            (1, 'duck duck duck pond', 'ducks'),
+            (2, 'a single duck', 'birds'),
+            (3, 'nothing relevant here', 'misc')
+    """)
+    conn.execute("PRAGMA create_fts_index('notes', 'id', 'content', 'summary')")
+    yield conn
+    conn.close()
+
+
+def test_fts_search_matches_real_index(fts_conn):
+    """_fts_search returns only matching ids, best BM25 score first"""
+    assert teambook_api._fts_search(fts_conn, "duck", 10) == [1, 2]
+    assert teambook_api._fts_search(fts_conn, "duck", 1) == [1]
+    assert teambook_api._fts_search(fts_conn, "zebra", 10) == []
+
+
+def test_fts_indexed_max_id_reads_snapshot(fts_conn, monkeypatch):
+    """Notes inserted after the index was built are past the watermark"""
+    monkeypatch.setattr(teambook_api, '_fts_indexed_max_ids', {})
+    fts_conn.execute("INSERT INTO notes VALUES (4, 'late duck', 'late')")
+
+    assert teambook_api._fts_indexed_max_id(fts_conn) == 3
+    assert teambook_api._fts_search(fts_conn, "late", 10) == []
+
+
+# ============= BATCH WRITES =============
+
+@pytest.fixture
+def notes_db(monkeypatch):
+    """Route teambook_api's DuckDB path to an in-memory notes table"""
+    conn = duckdb.connect()
+    conn.execute("""
+        CREATE TABLE notes (
+            id BIGINT PRIMARY KEY,
+            content VARCHAR,
+            content_compressed BLOB,
+            summary VARCHAR CHECK (summary IS NULL OR summary <> 'reject me'),
+            tags VARCHAR[],
+            pinned BOOLEAN DEFAULT FALSE,
+            author VARCHAR,
+            owner VARCHAR,
+            teambook_name VARCHAR,
+            type VARCHAR,
+            parent_id BIGINT,
+            created TIMESTAMP,
+            session_id BIGINT,
+            linked_items VARCHAR,
+            representation_policy VARCHAR,
+            pagerank DOUBLE DEFAULT 0.0,
+            has_vector BOOLEAN DEFAULT FALSE,
+            metadata VARCHAR,
+            tamper_hash VARCHAR
+        )
+    """)
+
+    @contextmanager
+    def _conn():
+        yield conn
+
+    monkeypatch.setattr(teambook_api, '_get_db_conn', _conn)
+    monkeypatch.setattr(teambook_api, '_current_adapter', lambda: None)
+    monkeypatch.setattr(teambook_api, '_link_written_note', lambda *args: None)
+    monkeypatch.setattr(teambook_api, '_enqueue_post_write', lambda *args, **kwargs: None)
+    monkeypatch.setattr(teambook_api, '_log_operation', lambda *args: None)
+    monkeypatch.setattr(teambook_api, 'save_last_operation', lambda *args: None)
+    teambook_api._id_sequences_ready.clear()
+    yield conn
+    conn.close()
+
+
+def _result_ids(output):
+    return [int(line.split('|')[0]) for line in output.splitlines()]
+
+
+def test_write_many_returns_ids_in_item_order(notes_db):
+    output = teambook_api.write_many(items=[
+        {'content': 'first note'},
+        {'content': 'second note'},
+        {'content': 'third note'},
+    ])
+    ids = _result_ids(output)
+
+    assert len(ids) == 3
+    rows = notes_db.execute("SELECT id, content FROM notes ORDER BY id").fetchall()
+    assert [r[0] for r in rows] == ids
+    assert [r[1] for r in rows] == ['first note', 'second note', 'third note']
+
+
+def test_write_many_writes_nothing_when_a_row_fails(notes_db):
+    output = teambook_api.write_many(items=[
+        {'content': 'fine'},
+        {'content': 'bad', 'summary': 'reject me'},
+    ])
+
+    assert output.startswith('!write_failed:')
+    assert notes_db.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+
+
+def test_write_many_rejects_oversized_batch(notes_db):
+    items = [{'content': f'note {i}'} for i in range(teambook_api._ts.BATCH_MAX + 1)]
+
+    assert teambook_api.write_many(items=items) == f"!write_failed:max_exceeded:{teambook_api._ts.BATCH_MAX}"
+    assert notes_db.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0
+
+
+def test_write_many_adapter_reports_partial_writes(notes_db, monkeypatch):
+    class FlakyAdapter:
+        def __init__(self):
+            self.written = []
+
+        def write_note(self, **note):
+            if len(self.written) == 2:
+                raise RuntimeError('backend down')
+            self.written.append(note['content'])
+            return 100 + len(self.written)
+
+    adapter = FlakyAdapter()
+    monkeypatch.setattr(teambook_api, '_current_adapter', lambda: adapter)
+
+    lines = teambook_api.write_many(items=[{'content': f'note {i}'} for i in range(4)]).splitlines()
+
+    assert _result_ids('\n'.join(lines[:2])) == [101, 102]
+    assert lines[2].startswith('!write_failed:partial:2/4:')
+    assert adapter.written == ['note 0', 'note 1']
+
+
+def test_create_attempts_numbers_attempts_in_order(notes_db):
+    notes_db.execute("INSERT INTO notes (id, content, type) VALUES (7, 'goal', 'evolution')")
+    teambook_api.create_attempts(evo_id=7, contents=['a'])
+
+    output = teambook_api.create_attempts(evo_id=7, contents=['b', 'c'])
+    lines = output.splitlines()
+
+    assert [line.split('|')[0] for line in lines] == ['attempt:7.2', 'attempt:7.3']
+    ids = [int(line.split('|')[1]) for line in lines]
+    rows = notes_db.execute(
+        "SELECT id, content FROM notes WHERE parent_id = 7 AND type = 'attempt' ORDER BY id"
+    ).fetchall()
+    assert rows[1:] == [(ids[0], 'b'), (ids[1], 'c')]
+
+
+def test_create_attempts_rejects_oversized_batch(notes_db):
+    contents = [f'try {i}' for i in range(teambook_api._ts.BATCH_MAX + 1)]
+
+    assert teambook_api.create_attempts(evo_id=7, contents=contents) == f"!attempt_failed:max_exceeded:{teambook_api._ts.BATCH_MAX}"
+    assert teambook_api.create_attempts(evo_id=99, contents=['x']) == "!attempt_failed:evo_not_found:99"
+
+
+# ============= KEYWORD SEARCH =============
+
+def test_read_finds_notes_written_after_the_fts_snapshot(notes_db, monkeypatch):
+    """FTS hits are merged with an ILIKE scan over ids the index hasn't seen"""
+    notes_db.execute("""
+        INSERT INTO notes (id, content, summary) VALUES
+            (1, 'duck pond', 'indexed duck'),
+            (2, 'duck again', 'indexed, not an FTS hit'),
+            (3, 'new duck', 'written after the index')
+    """)
+    monkeypatch.setattr(teambook_api.teambook_storage, 'FTS_ENABLED', True, raising=False)
+    monkeypatch.setattr(teambook_api, '_fts_search', lambda conn, query, limit: [1])
+    monkeypatch.setattr(teambook_api, '_fts_indexed_max_id', lambda conn: 2)
+    monkeypatch.setattr(teambook_api, '_fts_stale', False)
+
+    ids = _result_ids(teambook_api.read(query='duck', mode='keyword'))
+
+    assert sorted(ids) == [1, 3]
+
+
+def test_read_falls_back_to_full_ilike_without_fts_hits(notes_db, monkeypatch):
+    notes_db.execute("INSERT INTO notes (id, content, summary) VALUES (1, 'a duckling', 'x'), (2, 'goose', 'y')")
+    monkeypatch.setattr(teambook_api.teambook_storage, 'FTS_ENABLED', True, raising=False)
+    monkeypatch.setattr(teambook_api, '_fts_search', lambda conn, query, limit: [])
+    monkeypatch.setattr(teambook_api, '_fts_indexed_max_id', lambda conn: 2)
+    monkeypatch.setattr(teambook_api, '_fts_stale', False)
+
+    assert _result_ids(teambook_api.read(query='duck', mode='keyword')) == [1]
+
+
+# ============= OPERATION LOG =============
+
+def test_flush_op_log_writes_each_entry_to_its_own_teambook(tmp_path, monkeypatch):
+    monkeypatch.setattr(teambook_api._ts, 'TEAMBOOK_ROOT', tmp_path)
+    monkeypatch.setattr(teambook_api._ts, 'TEAMBOOK_PRIVATE_ROOT', tmp_path / '_private')
+    for teambook in ('alpha', None):
+        db_file = teambook_api._teambook_db_file(teambook)
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        with duckdb.connect(str(db_file)) as conn:
+            conn.execute("""
+                CREATE TABLE stats (
+                    id BIGINT PRIMARY KEY, operation VARCHAR NOT NULL,
+                    ts TIMESTAMPTZ NOT NULL, dur_ms INTEGER, author VARCHAR
+                )
+            """)
+
+    now = teambook_api.datetime.now(teambook_api.timezone.utc)
+    teambook_api._flush_op_log([
+        ('alpha', 'write', now, 5, 'tester'),
+        (None, 'vault_store', now, None, 'tester'),
+        ('alpha', 'read', now, 7, 'tester'),
+    ])
+
+    def _rows(teambook):
+        with teambook_api._teambook_conn(teambook) as conn:
+            return conn.execute("SELECT id, operation, dur_ms FROM stats ORDER BY id").fetchall()
+
+    assert _rows('alpha') == [(1, 'write', 5), (2, 'read', 7)]
+    assert _rows(None) == [(1, 'vault_store', None)]
+    assert teambook_api._ts.CURRENT_TEAMBOOK is None
+
+
+def test_op_log_worker_flushes_in_batches(monkeypatch):
+    flushed = []
+    monkeypatch.setattr(teambook_api, '_flush_op_log', lambda batch: flushed.append(len(batch)))
+    monkeypatch.setattr(teambook_api._ts, 'CURRENT_TEAMBOOK', 'alpha')
+
+    for i in range(teambook_api.OP_LOG_BATCH_MAX + 3):
+        teambook_api._log_operation('read', i)
+    teambook_api._drain_op_log(timeout=5)
+
+    assert sum(flushed) == teambook_api.OP_LOG_BATCH_MAX + 3
+    assert max(flushed) <= teambook_api.OP_LOG_BATCH_MAX
+    assert len(flushed) < teambook_api.OP_LOG_BATCH_MAX
+
+
+# ============= TOWN HALL =============
+
+def test_announce_publishes_to_captured_teambook(monkeypatch):
+    published = []
+    monkeypatch.setattr(teambook_api, 'PUBSUB_AVAILABLE', True)
+    monkeypatch.setattr(
+        teambook_api, 'publish_broadcast',
+        lambda channel, content, teambook=None: published.append((channel, content, teambook)),
+        raising=False
+    )
+    monkeypatch.setattr(teambook_api._ts, 'CURRENT_TEAMBOOK', 'town-hall')
+
+    teambook_api._announce_in_background("hello", 'town-hall')
+    teambook_api._ts.CURRENT_TEAMBOOK = 'elsewhere'
+    for thread in teambook_api.threading.enumerate():
+        if thread.name == 'town-hall-announce':
+            thread.join(timeout=5)
+
+    assert published == [("general", "hello", 'town-hall')]
+    assert teambook_api._ts.CURRENT_TEAMBOOK == 'elsewhere'
+
+
+# ============= POST-WRITE VECTORS =============
+
+@pytest.fixture
+def vector_store(monkeypatch):
+    """Record vector adds and collection opens instead of embedding"""
+    added, opened, requeued = [], [], []
+    monkeypatch.setattr(teambook_api, '_add_to_vector_store', lambda note_id, *args: added.append(note_id))
+    monkeypatch.setattr(teambook_api, '_init_vector_db', lambda: opened.append(teambook_api._ts.CURRENT_TEAMBOOK))
+    monkeypatch.setattr(teambook_api, '_enqueue_post_write', lambda note_id, note, vector_only=False: requeued.append(note_id))
+    monkeypatch.setattr(teambook_api, '_deferred_vector_adds', {})
+    monkeypatch.setattr(teambook_api, '_vectors_ready_for', teambook_api._NOT_INITIALIZED)
+    return added, opened, requeued
+
+
+def test_vector_add_uses_collection_still_open_for_its_teambook(vector_store, monkeypatch):
+    added, opened, _ = vector_store
+    monkeypatch.setattr(teambook_api, '_vectors_ready_for', 'alpha')
+    monkeypatch.setattr(teambook_api._ts, 'CURRENT_TEAMBOOK', 'beta')
+
+    teambook_api._add_written_note_vector(1, {'content': 'c', 'summary': 's', 'tags': []}, 'alpha')
+
+    assert added == [1]
+    assert opened == []
+
+
+def test_vector_add_is_deferred_until_its_teambook_reopens(vector_store, monkeypatch):
+    added, opened, requeued = vector_store
+    monkeypatch.setattr(teambook_api._ts, 'CURRENT_TEAMBOOK', 'beta')
+    teambook_api._ensure_vectors()
+
+    teambook_api._add_written_note_vector(1, {'content': 'c', 'summary': 's', 'tags': []}, 'alpha')
+    assert added == []
+
+    teambook_api._ts.CURRENT_TEAMBOOK = 'alpha'
+    teambook_api._ensure_vectors()
+
+    assert opened == ['beta', 'alpha']
+    assert requeued == [1]